@@ -0,0 +1,45 @@
+from __future__ import annotations
+import json
+import time
+
+from backend.src.schemas.events import SSEEvent
+from backend.src.stream.emitter import Emitter
+from backend.src.stream.sse import sse_pack
+
+N = 200_000
+
+
+def legacy_pack(run_id: str, trace_id: str, tok: str) -> str:
+    # Previous path: validate a pydantic model, dump it, then stdlib json.
+    ev = SSEEvent(type="token", run_id=run_id, trace_id=trace_id, ts_ms=int(time.time() * 1000), data={"text": tok})
+    return "event: message\ndata: " + json.dumps(ev.model_dump(), ensure_ascii=False) + "\n\n"
+
+
+def bench(name: str, fn) -> None:
+    t0 = time.perf_counter()
+    fn()
+    dt = time.perf_counter() - t0
+    print(f"{name:<28} {N / dt:>12,.0f} events/s/core")
+
+
+def run_legacy() -> None:
+    acc = ""
+    for i in range(N):
+        tok = f"tok{i} "
+        acc += tok
+        legacy_pack("r1", "t1", tok)
+
+
+def run_fast() -> None:
+    parts: list[str] = []
+    em = Emitter(run_id="r1", trace_id="t1", send=sse_pack)
+    for i in range(N):
+        tok = f"tok{i} "
+        parts.append(tok)
+        em.emit("token", {"text": tok})
+    "".join(parts)
+
+
+if __name__ == "__main__":
+    bench("before (pydantic + json)", run_legacy)
+    bench("after (template + fast json)", run_fast)
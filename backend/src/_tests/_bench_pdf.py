@@ -0,0 +1,67 @@
+from __future__ import annotations
+import io
+import time
+
+from backend.src.tools.docs.doc_tool import PDF_LINES_PER_PAGE, _escape_pdf_text, _pdf_lines, write_pdf
+
+REPEAT = 5
+
+
+def make_doc(pages: int) -> str:
+    rows = ["# Benchmark report", ""]
+    i = 0
+    while len(rows) < pages * PDF_LINES_PER_PAGE:
+        rows.append(f"## Section {i}" if i % 20 == 0 else f"Line {i}: the quick brown fox (jumps) over the lazy dog.")
+        i += 1
+    return "\n".join(rows)
+
+
+def legacy_pdf(content: str) -> bytes:
+    # Previous approach (without its 220-line cap): str += per line and per object,
+    # re-encoding the whole document to measure each xref offset.
+    body = "BT\n/F1 11 Tf\n50 800 Td\n14 TL\n"
+    for ln, style in _pdf_lines(content):
+        if style == "blank":
+            body += "T*\n"
+            continue
+        body += "/F2 12 Tf\n" if style != "body" else "/F1 11 Tf\n"
+        body += f"({_escape_pdf_text(ln)}) Tj\nT*\n"
+    body += "ET\n"
+    objs = [
+        "1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n",
+        "2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n",
+        "3 0 obj\n<< /Type /Page /Parent 2 0 R /Contents 4 0 R >>\nendobj\n",
+        f"4 0 obj\n<< /Length {len(body)} >>\nstream\n{body}endstream\nendobj\n",
+    ]
+    pdf = "%PDF-1.4\n"
+    offsets = []
+    for obj in objs:
+        offsets.append(len(pdf.encode("latin-1")))
+        pdf += obj
+    xref_pos = len(pdf.encode("latin-1"))
+    pdf += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n"
+    for off in offsets:
+        pdf += f"{off:010d} 00000 n \n"
+    pdf += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref_pos}\n%%EOF\n"
+    return pdf.encode("latin-1", "replace")
+
+
+def new_pdf(content: str) -> bytes:
+    buf = io.BytesIO()
+    write_pdf(buf, content)
+    return buf.getvalue()
+
+
+def bench(name: str, fn, content: str) -> None:
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        size = len(fn(content))
+    dt = (time.perf_counter() - t0) / REPEAT
+    print(f"{name:<32} {dt * 1000:>9.2f} ms  {size:>10,} bytes")
+
+
+if __name__ == "__main__":
+    for pages in (10, 100):
+        doc = make_doc(pages)
+        bench(f"{pages} pages: before (str +=)", legacy_pdf, doc)
+        bench(f"{pages} pages: after (streamed)", new_pdf, doc)
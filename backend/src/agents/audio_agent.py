@@ -10,6 +10,11 @@ from backend.src.tools.media.tts_tool import tts_generate
 def run(task: Dict[str, Any], state: Dict[str, Any], em: Emitter) -> Dict[str, Any]:
     t = AudioTask.model_validate(task)
     em.emit("task_start", {"task_id": t.id, "kind": t.kind})
-    out = tts_generate(state["session_id"], t.text, voice=t.voice)
+    fresh = t.regenerate
+    # Announce the asset as soon as audio starts arriving; block_end follows when complete.
+    def on_first_chunk(data: Dict[str, Any]) -> None:
+        em.emit("block_update", {"block_id": t.id, "payload": {"task_id": "tts", "kind": "tts", "ok": True, "data": data}})
+
+    out = tts_generate(state["session_id"], t.text, voice=t.voice, fresh=fresh, on_first_chunk=on_first_chunk)
     em.emit("task_result", {"task_id": t.id, "kind": t.kind, "ok": out.get("ok", False)})
     return out
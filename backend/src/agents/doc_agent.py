@@ -2,10 +2,13 @@
 from __future__ import annotations
 from typing import Any, Dict
 
+from backend.src.schemas.results import ToolResult
 from backend.src.schemas.tasks import DocTask
 from backend.src.stream.emitter import Emitter
-from backend.src.llm.factory import get_llm
-from backend.src.tools.docs.doc_tool import doc_extract_text, doc_generate_file
+from backend.src.graph.streaming import stream_block
+from backend.src.tools.media.artifact_cache import cache_get, cache_key, cache_put
+from backend.src.tools.docs.doc_tool import DocStreamWriter, doc_extract_text, doc_generate_file
+from backend.src.tools.docs.map_reduce import section_summaries
 
 
 def run(task: Dict[str, Any], state: Dict[str, Any], em: Emitter, provider: str, model: str) -> Dict[str, Any]:
@@ -13,16 +16,65 @@ def run(task: Dict[str, Any], state: Dict[str, Any], em: Emitter, provider: str,
     em.emit("task_start", {"task_id": t.id, "kind": t.kind})
     if t.instruction == "extract":
         att = next((a for a in state.get("attachments", []) if a.get("id") == t.attachment_id), None)
-        out = doc_extract_text(att["path"]) if att else {"ok": False, "error": "Attachment not found"}
+        out = doc_extract_text(att["path"], sha=att.get("sha256")) if att else {"ok": False, "error": "Attachment not found"}
+    elif t.instruction == "summarize":
+        att = next((a for a in state.get("attachments", []) if a.get("id") == t.attachment_id), None)
+        out = _summarize(t, att, state, em, provider, model) if att else {"ok": False, "error": "Attachment not found"}
     else:
-        llm = get_llm(provider, model, streaming=False, temperature=0.2)
-        prompt = (
-            "Write a clean markdown document from the request below.\n"
-            "Use a title, short sections, and concise bullets where useful.\n\n"
-            f"REQUEST:\n{t.prompt or state.get('user_text', '')}\n"
-        )
-        msg = llm.invoke(prompt)
-        content = (getattr(msg, "content", "") or "").strip()
-        out = doc_generate_file(state["session_id"], content, fmt=t.format)
+        request = t.prompt or state.get("user_text", "")
+        key = cache_key("doc", provider=provider, model=model, request=request, format=t.format)
+        fresh = t.regenerate
+        hit = None if fresh else cache_get(state["session_id"], key)
+        if hit:
+            out = ToolResult(
+                task_id="doc", kind="doc", ok=True,
+                data={**hit["meta"], "url": hit["url"], "filename": hit["filename"], "cached": True},
+            ).model_dump()
+        else:
+            prompt = (
+                "Write a clean markdown document from the request below.\n"
+                "Use a title, short sections, and concise bullets where useful.\n\n"
+                f"REQUEST:\n{request}\n"
+            )
+            # Markdown is the model's output format, so .md files are written as tokens
+            # arrive; other formats are rendered from the full text at the end.
+            writer = DocStreamWriter(state["session_id"]) if t.format == "md" else None
+            try:
+                content = stream_block(
+                    prompt, em, t.id, provider, model,
+                    on_token=writer.write if writer is not None else None,
+                ).strip()
+                em.check_cancelled()
+                out = writer.finish() if writer is not None else doc_generate_file(state["session_id"], content, fmt=t.format)
+            except BaseException:
+                if writer is not None:
+                    writer.abort()
+                raise
+            data = out.get("data") or {}
+            cache_put(key, state["session_id"], data.get("filename", ""), {"mime": data.get("mime"), "text": data.get("text", "")})
     em.emit("task_result", {"task_id": t.id, "kind": t.kind, "ok": out.get("ok", False)})
     return out
+
+
+def _summarize(t: DocTask, att: Dict[str, Any], state: Dict[str, Any], em: Emitter, provider: str, model: str) -> Dict[str, Any]:
+    # Whole-document asks: map-reduce over every section. The reduced summaries are the
+    # block's content and the text lane's context; the one answer comes from the text lane.
+    parts, sections = section_summaries(att["path"], provider, model, sha=att.get("sha256"), check=em.check_cancelled)
+    if not parts:
+        return ToolResult(task_id="doc", kind="doc", ok=False, error="No text could be extracted from the document").model_dump()
+    return ToolResult(
+        task_id="doc", kind="doc", ok=True,
+        data={"text": "\n\n".join(parts), "sections": sections, "map_reduce": True, "source": att.get("name", "")},
+    ).model_dump()
+    question = t.prompt or state.get("user_text", "") or "Summarize the document."
+    prompt = (
+        f"Below are section summaries covering the whole document '{att.get('name', '')}', in order.\n"
+        "Answer the request using only them. Be concise and structured in markdown.\n\n"
+        f"REQUEST:\n{question}\n\n"
+        "SECTION SUMMARIES:\n" + "\n\n---\n\n".join(parts) + "\n"
+    )
+    text = stream_block(prompt, em, t.id, provider, model).strip()
+    return ToolResult(
+        task_id="doc", kind="doc", ok=True,
+        data={"text": text, "sections": sections, "map_reduce": True, "source": att.get("name", "")},
+    ).model_dump()
@@ -16,6 +16,7 @@ def run(task: Dict[str, Any], state: Dict[str, Any], em: Emitter) -> Dict[str, A
             f"{prompt}\n\n"
             f"CRITICAL CONSTRAINT: Keep main subject as '{t.subject_lock}'. Do not replace it."
         )
-    out = image_generate(state["session_id"], prompt, size=t.size)
+    fresh = t.regenerate
+    out = image_generate(state["session_id"], prompt, size=t.size, fresh=fresh)
     em.emit("task_result", {"task_id": t.id, "kind": t.kind, "ok": out.get("ok", False)})
     return out
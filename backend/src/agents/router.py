@@ -19,6 +19,7 @@ from backend.src.agents.vision_agent import run as run_vision
 
 def run_task(task: Dict[str, Any], state: Dict[str, Any], em: Emitter, provider: str, model: str) -> Dict[str, Any]:
     t = task_adapter.validate_python(task)
+    em.check_cancelled()
     if t.kind == "web":
         return run_web(task, state, em)
     if t.kind == "rag":
@@ -10,7 +10,21 @@ from backend.src.tools.vision.vision_tool import vision_analyze
 def run(task: Dict[str, Any], state: Dict[str, Any], em: Emitter) -> Dict[str, Any]:
     t = VisionTask.model_validate(task)
     em.emit("task_start", {"task_id": t.id, "kind": t.kind})
-    att = next((a for a in state.get("attachments", []) if a.get("id") == t.image_attachment_id), None)
-    out = vision_analyze(t.prompt, att["path"]) if att else {"ok": False, "error": "Image not found"}
+    ids = [t.image_attachment_id] + [i for i in t.image_attachment_ids if i != t.image_attachment_id]
+    by_id = {a.get("id"): a for a in state.get("attachments", [])}
+    atts = [by_id[i] for i in ids if i in by_id]
+
+    def on_token(tok: str) -> None:
+        em.check_cancelled()
+        em.emit("block_token", {"block_id": t.id, "text": tok})
+
+    out = (
+        vision_analyze(
+            t.prompt, [a["path"] for a in atts], shas=[a.get("sha256") for a in atts],
+            fresh=t.regenerate, on_token=on_token,
+        )
+        if atts
+        else {"ok": False, "error": "Image not found"}
+    )
     em.emit("task_result", {"task_id": t.id, "kind": t.kind, "ok": out.get("ok", False)})
     return out
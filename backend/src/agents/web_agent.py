@@ -8,6 +8,7 @@ from backend.src.stream.emitter import Emitter
 from backend.src.tools.web.tavily_tool import tavily_search
 from backend.src.tools.web.wiki_tool import wikipedia_search
 from backend.src.tools.web.arxiv_tool import arxiv_search
+from backend.src.tools.web.web_cache import web_cache_stats
 
 
 def run(task: Dict[str, Any], state: Dict[str, Any], em: Emitter) -> Dict[str, Any]:
@@ -26,6 +27,7 @@ def run(task: Dict[str, Any], state: Dict[str, Any], em: Emitter) -> Dict[str, A
         calls.append(("arxiv", lambda: arxiv_search.invoke({"query": t.query, "top_k": t.top_k})))
 
     if calls:
+        em.check_cancelled()
         with ThreadPoolExecutor(max_workers=len(calls)) as ex:
             fut_to_name = {ex.submit(fn): name for name, fn in calls}
             for fut in as_completed(fut_to_name):
@@ -36,12 +38,14 @@ def run(task: Dict[str, Any], state: Dict[str, Any], em: Emitter) -> Dict[str, A
                     errs.append(f"{name}: {e}")
 
     ok = any(o.get("ok") for o in outs) if outs else False
-    em.emit("task_result", {"task_id": t.id, "kind": t.kind, "ok": ok, "errors": errs})
+    hits = sum(1 for o in outs if (o.get("data") or {}).get("cached"))
+    cache = {"hits": hits, "lookups": len(calls), "sources": web_cache_stats()}
+    em.emit("task_result", {"task_id": t.id, "kind": t.kind, "ok": ok, "errors": errs, "cache": cache})
     return {
         "task_id": t.id,
         "kind": "web",
         "ok": ok,
-        "data": {"parts": outs, "errors": errs},
+        "data": {"parts": outs, "errors": errs, "cache": cache},
         "citations": sum([o.get("citations", []) for o in outs], []),
         "error": "; ".join(errs) if (errs and not ok) else None,
     }
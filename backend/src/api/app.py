@@ -1,13 +1,17 @@
 # api/app.py
 from __future__ import annotations
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.src.core.config import bootstrap_env
+from backend.src.core.http import close_all
 from backend.src.api.routes_chat import router as chat_router
 from backend.src.api.routes_upload import router as upload_router
 from backend.src.api.routes_assets import router as assets_router
 from backend.src.api.routes_models import router as models_router
+from backend.src.session.disk_gc import gc_loop
 from backend.src.tools.rag.kb_index import ensure_kb_index
 from backend.src.tools.rag.kb_retriever import load_kb_vectorstore
 
@@ -35,3 +39,13 @@ async def _warmup_kb() -> None:
             load_kb_vectorstore()
     except Exception:
         pass
+
+
+@app.on_event("startup")
+async def _start_disk_gc() -> None:
+    app.state.disk_gc = asyncio.create_task(gc_loop())
+
+
+@app.on_event("shutdown")
+async def _close_http() -> None:
+    close_all()
@@ -1,17 +1,111 @@
 # api/routes_assets.py
 from __future__ import annotations
+import asyncio
+import hashlib
+import mimetypes
+import os
+import time
 from pathlib import Path
+from typing import AsyncGenerator, Dict, Tuple
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from backend.src.session.disk_gc import gc_stats, touch
+from backend.src.tools.media.assets import partial_marker
 
 router = APIRouter()
 BASE = Path("backend/data/uploads")
 
+# Asset files are written once under a fresh name and never modified.
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+GROW_POLL_SECS = 0.05
+GROW_STALL_SECS = 60.0
+_ETAGS: Dict[Tuple[str, int, int], str] = {}
+_ETAGS_MAX = 4096
+
+
+def _etag(path: Path, st: os.stat_result) -> str:
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    tag = _ETAGS.get(key)
+    if tag is None:
+        h = hashlib.sha256()
+        with path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        tag = f'"{h.hexdigest()[:32]}"'
+        if len(_ETAGS) >= _ETAGS_MAX:
+            _ETAGS.clear()
+        _ETAGS[key] = tag
+    return tag
+
+
+def _gz_etag(etag: str) -> str:
+    return etag[:-1] + '-gz"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # Either encoding's tag validates: both are derived from the same content.
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag in tags or _gz_etag(etag) in tags
+
+
+async def _follow(path: Path) -> AsyncGenerator[bytes, None]:
+    """Yield a file while it is being written, until its partial marker disappears.
+
+    Raises when the writer aborted (file removed with its marker) or stalled, so the
+    response is cut off instead of ending like a complete body.
+    """
+    marker = partial_marker(path)
+    last_growth = time.monotonic()
+    with path.open("rb") as f:
+        while True:
+            chunk = f.read(64 * 1024)
+            if chunk:
+                last_growth = time.monotonic()
+                yield chunk
+                continue
+            if not marker.exists():
+                # AssetWriter.abort() unlinks the file before the marker.
+                if not path.exists():
+                    raise RuntimeError(f"asset generation failed: {path.name}")
+                rest = f.read()
+                if rest:
+                    yield rest
+                return
+            if time.monotonic() - last_growth > GROW_STALL_SECS:
+                raise RuntimeError(f"asset writer stalled: {path.name}")
+            await asyncio.sleep(GROW_POLL_SECS)
+
 
 @router.get("/assets/{session_id}/{filename}")
-def asset(session_id: str, filename: str):
+def asset(session_id: str, filename: str, request: Request):
     path = BASE / session_id / filename
-    if not path.exists():
+    if not path.is_file():
         raise HTTPException(status_code=404, detail="Not found")
-    return FileResponse(path)
+    touch(path)
+    if partial_marker(path).exists():
+        # Still being generated (e.g. streaming TTS): serve what exists and follow the
+        # writer. Not cacheable; once complete the same URL is served normally.
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        return StreamingResponse(_follow(path), media_type=media_type, headers={"Cache-Control": "no-store"})
+    st = path.stat()
+    etag = _etag(path, st)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    # Precompressed variant (see save_asset) for whole-body requests; ranges use the
+    # identity file so byte offsets stay meaningful. FileResponse handles Range/206.
+    gz = path.with_name(path.name + ".gz")
+    if "range" not in request.headers and "gzip" in request.headers.get("accept-encoding", "") and gz.is_file():
+        headers.update({"Content-Encoding": "gzip", "Vary": "Accept-Encoding", "ETag": _gz_etag(etag)})
+        return FileResponse(gz, headers=headers, media_type=mimetypes.guess_type(path.name)[0] or "application/octet-stream")
+    if gz.is_file():
+        headers["Vary"] = "Accept-Encoding"
+    return FileResponse(path, headers=headers, stat_result=st)
+
+
+@router.get("/disk/stats")
+def disk_stats():
+    return gc_stats()
@@ -3,19 +3,28 @@ from __future__ import annotations
 import asyncio
 import os
 import re
+from typing import Optional, Set
 from uuid import uuid4
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from backend.src.core.constants import MAX_HISTORY_MESSAGES
+from backend.src.core.constants import MAX_HISTORY_MESSAGES, SSE_RETRY_MS
+from backend.src.core.logging import get_logger
+from backend.src.graph.run_pool import get_run_pool
 from backend.src.graph.runner import build_graph, run_graph
 from backend.src.llm.factory import get_llm
-from backend.src.session.store import get_session, cleanup
+from backend.src.session.memory import update_memory
+from backend.src.session.store import cleanup, get_session, session_active, session_lock, update_session
+from backend.src.stream.bus import get_bus
 from backend.src.stream.sse import sse_gen
 
 router = APIRouter()
+log = get_logger("omniagent.chat")
+DISCONNECT_POLL_SECS = 1.0
+# Post-turn memory upkeep tasks, referenced until done so they are not collected.
+_BACKGROUND: Set[asyncio.Task] = set()
 
 
 class ChatIn(BaseModel):
@@ -171,7 +180,7 @@ async def _stream_initial_block(send, user_text: str, provider: str, model: str,
         "No markdown, no bullets, no quotes.\n"
         f"USER:\n{user_text}\n"
     )
-    em_text = ""
+    em_parts: list[str] = []
     send({"type": "block_start", "data": {"block_id": "__meta_initial__", "title": "Initial", "kind": "meta_initial"}})
     try:
         if start_delay_ms > 0:
@@ -180,7 +189,7 @@ async def _stream_initial_block(send, user_text: str, provider: str, model: str,
             words = scripted.split(" ")
             for i, w in enumerate(words):
                 tok = w + (" " if i < len(words) - 1 else "")
-                em_text += tok
+                em_parts.append(tok)
                 send({"type": "block_token", "data": {"block_id": "__meta_initial__", "text": tok}})
                 if delay_ms > 0:
                     await asyncio.sleep(delay_ms / 1000.0)
@@ -189,11 +198,11 @@ async def _stream_initial_block(send, user_text: str, provider: str, model: str,
             async for chunk in llm.astream(prompt):
                 tok = getattr(chunk, "content", "") or ""
                 if tok:
-                    em_text += tok
+                    em_parts.append(tok)
                     send({"type": "block_token", "data": {"block_id": "__meta_initial__", "text": tok}})
     except Exception:
-        em_text = "Working on your request now."
-        send({"type": "block_token", "data": {"block_id": "__meta_initial__", "text": em_text}})
+        em_parts = ["Working on your request now."]
+        send({"type": "block_token", "data": {"block_id": "__meta_initial__", "text": em_parts[0]}})
     finally:
         send(
             {
@@ -203,60 +212,169 @@ async def _stream_initial_block(send, user_text: str, provider: str, model: str,
                     "payload": {
                         "ok": True,
                         "kind": "meta_initial",
-                        "data": {"text": em_text.strip() or "Working on your request now.", "mime": "text/markdown"},
+                        "data": {"text": "".join(em_parts).strip() or "Working on your request now.", "mime": "text/markdown"},
                     },
                 },
             }
         )
 
 
-@router.post("/chat/stream")
-async def chat_stream(inp: ChatIn):
+def _sse_response(sub, request: Request, run_id: str, after_id: int = 0) -> StreamingResponse:
+    """Stream a run's events to one client, replaying buffered events newer than `after_id`."""
+
+    async def watch_disconnect():
+        # Starlette only notices a gone client on the next write; poll so silent
+        # phases (intent, slow tools) detach promptly as well.
+        while True:
+            if await request.is_disconnected():
+                sub.detach()
+                return
+            await asyncio.sleep(DISCONNECT_POLL_SECS)
+
+    async def stream():
+        watcher = asyncio.create_task(watch_disconnect())
+        sse_stats: dict = {}
+        try:
+            yield b"retry: %d\n\n" % SSE_RETRY_MS
+            async for frame in sse_gen(sub, stats=sse_stats):
+                yield frame
+        finally:
+            # Runs on normal completion and when the response is torn down on disconnect.
+            # With no subscriber left, the run is cancelled after the resume grace period.
+            watcher.cancel()
+            sub.close()
+            log.info(
+                "run_id=%s sse after_id=%d frames=%d heartbeats=%d blocked_ms=%.0f queue=%s",
+                run_id, after_id, sse_stats.get("frames", 0), sse_stats.get("heartbeats", 0),
+                sse_stats.get("blocked_ms", 0.0), sub.stats(),
+            )
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+async def _start_run(inp: ChatIn, detached: bool) -> str:
+    """Register a run on the event bus and queue it on the worker pool; returns its id.
+
+    Attached runs (chat_stream) are cancelled when their client leaves for good;
+    detached runs (POST /runs) execute to completion regardless of subscribers.
+    """
     cleanup()
-    sess = get_session(inp.session_id)
-    q: asyncio.Queue = asyncio.Queue()
     loop = asyncio.get_running_loop()
+    bus = get_bus()
+    pool = get_run_pool()
+
+    run_id, trace_id = str(uuid4())[:8], str(uuid4())[:8]
+    await bus.open(run_id)
 
     def send(ev):
-        loop.call_soon_threadsafe(q.put_nowait, ev)
+        loop.call_soon_threadsafe(bus.publish, run_id, ev)
 
-    run_id, trace_id = str(uuid4())[:8], str(uuid4())[:8]
-    artifact_memory = sess.get("artifact_memory", {}) or {}
-    artifact_memory.setdefault("lineage", {"image": [], "audio": [], "doc": []})
-    likely_tool_turn = _likely_tool_turn(inp.text, bool(sess.get("attachments", [])))
-    state = {"session_id": inp.session_id, "run_id": run_id, "trace_id": trace_id,
-             "user_text": inp.text, "attachments": sess.get("attachments", []),
-             "chat_history": sess.get("chat_history", []),
-             "last_image_prompt": sess.get("last_image_prompt"),
-             "artifact_memory": artifact_memory,
-             "initial_meta_emitted": likely_tool_turn}
-
-    app = build_graph(inp.provider, inp.model)
-    task = asyncio.create_task(run_graph(app, state, send, run_id=run_id, trace_id=trace_id))
-    initial_task = (
-        asyncio.create_task(_stream_initial_block(send, inp.text, inp.provider, inp.model, has_attachments=bool(sess.get("attachments", []))))
-        if likely_tool_turn
-        else None
-    )
+    async def execute():
+        # The pool runs turns of one session one at a time (keyed by session_id), so this
+        # turn sees the previous one's history without holding the session lock while it
+        # streams; uploads only wait for the short merge below.
+        with session_active(inp.session_id):
+            sess = get_session(inp.session_id)
+            has_attachments = bool(sess.get("attachments", []))
+            artifact_memory = sess.get("artifact_memory", {}) or {}
+            artifact_memory.setdefault("lineage", {"image": [], "audio": [], "doc": []})
+            likely_tool_turn = _likely_tool_turn(inp.text, has_attachments)
+            state = {"session_id": inp.session_id, "run_id": run_id, "trace_id": trace_id,
+                     "user_text": inp.text, "attachments": sess.get("attachments", []),
+                     "chat_history": sess.get("chat_history", []),
+                     "history_summary": sess.get("history_summary", ""),
+                     "turn_memory": sess.get("turn_memory", []),
+                     "last_image_prompt": sess.get("last_image_prompt"),
+                     "artifact_memory": artifact_memory,
+                     "initial_meta_emitted": likely_tool_turn}
+            app = build_graph(inp.provider, inp.model)
+            initial_task = (
+                asyncio.create_task(_stream_initial_block(send, inp.text, inp.provider, inp.model, has_attachments=has_attachments))
+                if likely_tool_turn
+                else None
+            )
+            try:
+                # A cancelled run raises here, so the session is kept as it was.
+                out = await run_graph(app, state, send, run_id=run_id, trace_id=trace_id)
+                if initial_task:
+                    await initial_task
+                final_text = (out or {}).get("final_text", "")
+                # Merge into the current session: attachments may have been added while
+                # the turn ran, possibly by another process.
+                def merge(sess):
+                    if (out or {}).get("last_image_prompt"):
+                        sess["last_image_prompt"] = out["last_image_prompt"]
+                    if (out or {}).get("artifact_memory"):
+                        sess["artifact_memory"] = out["artifact_memory"]
+                    sess["chat_history"].append({"role": "user", "content": inp.text})
+                    if final_text:
+                        sess["chat_history"].append({"role": "assistant", "content": final_text})
+                    sess["chat_history"] = sess["chat_history"][-MAX_HISTORY_MESSAGES:]
 
-    async def done():
-        try:
-            if initial_task:
-                await asyncio.gather(initial_task, task)
-                out = task.result()
-            else:
-                out = await task
-            final_text = (out or {}).get("final_text", "")
-            if (out or {}).get("last_image_prompt"):
-                sess["last_image_prompt"] = out["last_image_prompt"]
-            if (out or {}).get("artifact_memory"):
-                sess["artifact_memory"] = out["artifact_memory"]
-            sess["chat_history"].append({"role": "user", "content": inp.text})
-            if final_text:
-                sess["chat_history"].append({"role": "assistant", "content": final_text})
-            sess["chat_history"] = sess["chat_history"][-MAX_HISTORY_MESSAGES:]
-        finally:
-            await q.put(None)
+                async with session_lock(inp.session_id):
+                    update_session(inp.session_id, merge)
+            finally:
+                if initial_task and not initial_task.done():
+                    initial_task.cancel()
+                # Let events queued via call_soon_threadsafe land before closing the log.
+                await asyncio.sleep(0)
+                bus.close(run_id)
+        # Fold older turns into the summary and index this turn in the background; the
+        # next turn of this session can start right away.
+        task = asyncio.create_task(update_memory(inp.session_id, inp.provider, inp.model, inp.text, final_text))
+        _BACKGROUND.add(task)
+        task.add_done_callback(_BACKGROUND.discard)
+
+    if not pool.submit(run_id, execute, on_drop=lambda: bus.close(run_id), key=inp.session_id):
+        bus.close(run_id)
+        raise HTTPException(status_code=503, detail="Server busy: run queue is full")
+    if not detached:
+        bus.on_abandon(run_id, lambda: pool.cancel(run_id))
+    return run_id
+
+
+@router.post("/chat/stream")
+async def chat_stream(inp: ChatIn, request: Request):
+    run_id = await _start_run(inp, detached=False)
+    sub = await get_bus().subscribe(run_id)
+    return _sse_response(sub, request, run_id)
+
+
+@router.post("/runs")
+async def create_run(inp: ChatIn):
+    """Start a run without holding the request open; stream it from `stream_url`."""
+    run_id = await _start_run(inp, detached=True)
+    return {"run_id": run_id, "stream_url": f"/api/chat/stream/{run_id}"}
 
-    asyncio.create_task(done())
-    return StreamingResponse(sse_gen(q), media_type="text/event-stream")
+
+@router.get("/runs/{run_id}")
+def run_status(run_id: str):
+    state = get_run_pool().state(run_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Run not queued or running on this node")
+    return {"run_id": run_id, "state": state, "pool": get_run_pool().stats()}
+
+
+@router.delete("/runs/{run_id}")
+def cancel_run(run_id: str):
+    if not get_run_pool().cancel(run_id):
+        raise HTTPException(status_code=404, detail="Run not queued or running on this node")
+    return {"run_id": run_id, "cancelled": True}
+
+
+@router.get("/chat/stream/{run_id}")
+async def chat_stream_resume(
+    run_id: str,
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    after: Optional[int] = None,
+):
+    """Attach to a live or recently finished run (any node sharing the bus) without re-executing it."""
+    try:
+        after_id = int(last_event_id) if last_event_id else int(after or 0)
+    except ValueError:
+        after_id = 0
+    sub = await get_bus().subscribe(run_id, after_id)
+    if sub is None:
+        raise HTTPException(status_code=404, detail="Run not found or expired")
+    return _sse_response(sub, request, run_id, after_id=after_id)
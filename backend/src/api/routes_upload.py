@@ -1,15 +1,30 @@
 # api/routes_upload.py
 from __future__ import annotations
+import asyncio
+import hashlib
 from pathlib import Path
+from typing import Set
 from uuid import uuid4
 import re
 
 from fastapi import APIRouter, UploadFile, File, Form
 
-from backend.src.session.store import get_session
+from backend.src.session.store import session_lock, update_session
+from backend.src.tools.media.blobs import link_blob, new_tmp_path
+from backend.src.tools.vision.preprocess import prepare_image
 
 router = APIRouter()
 BASE = Path("backend/data/uploads")
+# Vision prewarm tasks, referenced until done so they are not collected mid-flight.
+_BACKGROUND: Set[asyncio.Task] = set()
+
+
+async def _prewarm_vision(path: str, sha: str) -> None:
+    # Preprocess images while the user is still typing, so the vision call finds them cached.
+    try:
+        await asyncio.to_thread(prepare_image, path, sha)
+    except Exception:
+        pass
 
 
 @router.post("/upload")
@@ -21,16 +36,33 @@ async def upload(session_id: str = Form(...), f: UploadFile = File(...)):
     safe_name = re.sub(r"[^A-Za-z0-9._-]+", "_", f.filename or "upload.bin")
     path = out_dir / f"{fid}_{safe_name}"
 
-    # Stream upload to disk to keep request responsive for larger files.
-    with path.open("wb") as w:
-        while True:
-            chunk = await f.read(1024 * 1024)
-            if not chunk:
-                break
-            w.write(chunk)
+    # Stream upload to disk to keep request responsive for larger files, hashing as we go
+    # so repeat uploads share one stored copy and everything derived from it.
+    tmp = new_tmp_path()
+    h = hashlib.sha256()
+    try:
+        with tmp.open("wb") as w:
+            while True:
+                chunk = await f.read(1024 * 1024)
+                if not chunk:
+                    break
+                h.update(chunk)
+                w.write(chunk)
+        sha = h.hexdigest()
+        deduped = link_blob(tmp, sha, path)
+    finally:
+        tmp.unlink(missing_ok=True)
 
     kind = "image" if (f.content_type or "").startswith("image/") else ("audio" if (f.content_type or "").startswith("audio/") else "doc")
-    att = {"id": fid, "kind": kind, "name": f.filename, "mime": f.content_type, "path": str(path)}
+    att = {"id": fid, "kind": kind, "name": f.filename, "mime": f.content_type, "path": str(path),
+           "sha256": sha, "deduped": deduped}
 
-    get_session(sid)["attachments"].append(att)
+    # Short atomic merge: a running turn merges its results the same way, so neither
+    # write drops the other (also across processes sharing a SqliteStore).
+    async with session_lock(sid):
+        update_session(sid, lambda sess: sess["attachments"].append(att))
+    if kind == "image":
+        task = asyncio.create_task(_prewarm_vision(str(path), sha))
+        _BACKGROUND.add(task)
+        task.add_done_callback(_BACKGROUND.discard)
     return att
@@ -0,0 +1,92 @@
+# core/http.py
+from __future__ import annotations
+import importlib.util
+import os
+import threading
+from typing import Any, Dict
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Outbound HTTP: one pooled keep-alive client per upstream host, so repeated tool
+# calls reuse connections instead of paying DNS + TCP + TLS setup every time, and
+# one slow host cannot take every connection.
+_CLIENTS: Dict[str, httpx.Client] = {}
+_SHARED: Dict[str, Any] = {"session": None, "openai": None}
+_mu = threading.RLock()
+
+
+def _per_host() -> int:
+    return max(1, int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "16")))
+
+
+def _retries() -> int:
+    return max(0, int(os.getenv("HTTP_RETRIES", "2")))
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(float(os.getenv("HTTP_TIMEOUT_SECS", "30")), connect=float(os.getenv("HTTP_CONNECT_TIMEOUT_SECS", "10")))
+
+
+def http_client(host: str) -> httpx.Client:
+    """Shared httpx client for `host` (HTTP/2 unless HTTP2=0 or h2 is missing, keep-alive, connect retries)."""
+    c = _CLIENTS.get(host)
+    if c is None:
+        with _mu:
+            c = _CLIENTS.get(host)
+            if c is None:
+                # httpcore imports h2 only once a server picks HTTP/2, so check up front.
+                http2 = os.getenv("HTTP2", "1") != "0" and importlib.util.find_spec("h2") is not None
+                limits = httpx.Limits(
+                    max_connections=_per_host(),
+                    max_keepalive_connections=_per_host(),
+                    keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_SECS", "60")),
+                )
+                c = httpx.Client(
+                    timeout=_timeout(),
+                    # Retries connection failures only; request-level policy stays with callers/SDKs.
+                    transport=httpx.HTTPTransport(http2=http2, limits=limits, retries=_retries()),
+                )
+                _CLIENTS[host] = c
+    return c
+
+
+def requests_session() -> requests.Session:
+    """Shared requests session for libraries built on requests (per-host pools, GET retries)."""
+    if _SHARED["session"] is None:
+        with _mu:
+            if _SHARED["session"] is None:
+                retry = Retry(
+                    total=_retries(), backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET", "HEAD"),
+                )
+                adapter = HTTPAdapter(pool_connections=32, pool_maxsize=_per_host(), pool_block=True, max_retries=retry)
+                s = requests.Session()
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                _SHARED["session"] = s
+    return _SHARED["session"]
+
+
+def openai_client():
+    """Process-wide OpenAI SDK client on the shared transport (reads OPENAI_API_KEY once)."""
+    if _SHARED["openai"] is None:
+        from openai import OpenAI
+
+        with _mu:
+            if _SHARED["openai"] is None:
+                _SHARED["openai"] = OpenAI(http_client=http_client("api.openai.com"))
+    return _SHARED["openai"]
+
+
+def close_all() -> None:
+    with _mu:
+        for c in _CLIENTS.values():
+            c.close()
+        _CLIENTS.clear()
+        if _SHARED["session"] is not None:
+            _SHARED["session"].close()
+        _SHARED.update(session=None, openai=None)
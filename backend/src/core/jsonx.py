@@ -1,7 +1,9 @@
 # core/jsonx.py
 from __future__ import annotations
 import json
-from typing import Any, Dict
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
 
 
 def extract_json(text: str) -> Dict[str, Any]:
@@ -21,3 +23,19 @@ def extract_json(text: str) -> Dict[str, Any]:
         raise ValueError("No JSON object found in LLM output")
 
     return json.loads(text[a : b + 1])
+
+
+def read_json_file(path: Path) -> Optional[Any]:
+    """Parsed file content, or None when missing or unreadable."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def write_json_file(path: Path, obj: Any) -> None:
+    """Write via a temp file + rename so concurrent readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(obj, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
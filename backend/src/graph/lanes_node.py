@@ -7,10 +7,13 @@ import time
 from typing import Any, Dict, List
 
 from backend.src.llm.factory import get_llm
+from backend.src.llm.prompt_cache import add_usage, build_cached_messages, empty_usage
 from backend.src.graph.agent_memory import push_note
 from backend.src.schemas.plan import RunPlan
 from backend.src.graph.streaming import stream_tokens
 from backend.src.agents.router import run_task
+from backend.src.session.recall import recall_history
+from backend.src.tools.vision.vision_tool import image_notes, remember_note
 
 
 def lanes_node(provider: str, model: str):
@@ -47,6 +50,8 @@ def lanes_node(provider: str, model: str):
                 if sources == ["arxiv"]:
                     return "Results from Arxiv"
                 return "Results from Web"
+            if kind == "doc" and task.get("instruction") == "summarize":
+                return "Document Summary"
             return {
                 "rag": "Document Context",
                 "kb_rag": "Knowledge Base",
@@ -112,12 +117,10 @@ def lanes_node(provider: str, model: str):
 
         async def _stream_meta_block(block_id: str, title: str, kind: str, text: str) -> None:
             em.emit("block_start", {"block_id": block_id, "title": title, "kind": kind})
-            acc = ""
             parts = (text or "").split(" ")
             delay_ms = int(os.getenv("META_STREAM_TOKEN_DELAY_MS", "0"))
             for i, w in enumerate(parts):
                 tok = w + (" " if i < len(parts) - 1 else "")
-                acc += tok
                 em.emit("block_token", {"block_id": block_id, "text": tok})
                 if delay_ms > 0:
                     await asyncio.sleep(delay_ms / 1000.0)
@@ -125,7 +128,7 @@ def lanes_node(provider: str, model: str):
                 "block_end",
                 {
                     "block_id": block_id,
-                    "payload": {"ok": True, "kind": kind, "data": {"text": acc.strip(), "mime": "text/markdown"}},
+                    "payload": {"ok": True, "kind": kind, "data": {"text": (text or "").strip(), "mime": "text/markdown"}},
                 },
             )
 
@@ -137,9 +140,13 @@ def lanes_node(provider: str, model: str):
             em.emit("block_start", {"block_id": t["id"], "title": task_title(t), "kind": t["kind"]})
 
         knowledge_tasks = {"web", "rag", "kb_rag", "vision"}
-        needs_context_first = any(t.get("kind") in knowledge_tasks for t in tasks)
-        knowledge_task_items = [t for t in tasks if t.get("kind") in knowledge_tasks]
-        other_task_items = [t for t in tasks if t.get("kind") not in knowledge_tasks]
+        # Whole-document summaries feed the text answer like retrieval does.
+        def is_knowledge(t: Dict[str, Any]) -> bool:
+            return t.get("kind") in knowledge_tasks or (t.get("kind") == "doc" and t.get("instruction") == "summarize")
+
+        needs_context_first = any(is_knowledge(t) for t in tasks)
+        knowledge_task_items = [t for t in tasks if is_knowledge(t)]
+        other_task_items = [t for t in tasks if not is_knowledge(t)]
         # Run knowledge and non-knowledge lanes independently so text can start
         # as soon as retrieval context is ready (without waiting on slower image/doc/audio tasks).
         async def run_selected(selected: List[Dict[str, Any]]) -> None:
@@ -192,6 +199,10 @@ def lanes_node(provider: str, model: str):
                             "url": d.get("url"),
                             "text": (t.get("text") or "").strip(),
                         }
+                    if t.get("kind") == "vision" and r.get("ok"):
+                        d = r.get("data") or {}
+                        if d.get("shas") and str(d.get("text") or "").strip():
+                            remember_note(artifact_memory, d["shas"], d.get("prompt") or "", d["text"], d.get("model") or "")
                     if t.get("kind") == "doc" and r.get("ok"):
                         d = r.get("data") or {}
                         artifact_memory["doc"] = {
@@ -204,20 +215,11 @@ def lanes_node(provider: str, model: str):
             if selected:
                 await asyncio.gather(*[one(t) for t in selected])
 
-        knowledge_job = asyncio.create_task(run_selected(knowledge_task_items)) if knowledge_task_items else None
-        other_job = asyncio.create_task(run_selected(other_task_items)) if other_task_items else None
+        knowledge_job = em.track(asyncio.create_task(run_selected(knowledge_task_items))) if knowledge_task_items else None
+        other_job = em.track(asyncio.create_task(run_selected(other_task_items))) if other_task_items else None
         media_tasks = {"image_gen", "tts", "doc"}
         media_only = bool(tasks) and all(t.get("kind") in media_tasks for t in tasks)
 
-        def history_text() -> str:
-            if not history:
-                return ""
-            rows = []
-            for m in history:
-                role = m.get("role", "user").upper()
-                rows.append(f"{role}: {m.get('content', '')}")
-            return "\n".join(rows)
-
         def tool_context_text() -> str:
             rows = []
             for v in outs.values():
@@ -274,7 +276,12 @@ def lanes_node(provider: str, model: str):
                 if kind == "vision":
                     rows.append(f"VISION: {(v.get('data') or {}).get('text', '')}")
                 if kind == "doc":
-                    rows.append(f"DOC: {(v.get('data') or {}).get('text', '')[:1200]}")
+                    d = v.get("data") or {}
+                    if d.get("map_reduce"):
+                        # Already bounded by DOC_REDUCE_MAX_CHARS; this is the only pass that answers.
+                        rows.append(f"DOC: section summaries covering the whole of '{d.get('source', '')}', in order:\n{d.get('text', '')}")
+                    else:
+                        rows.append(f"DOC: {d.get('text', '')[:1200]}")
             # Fallback to persisted generated/extracted doc text when current turn has no doc/rag tool output.
             if not any(r.startswith("DOC:") or r.startswith("RAG:") for r in rows):
                 mem_doc = artifact_memory.get("doc") or {}
@@ -447,11 +454,21 @@ def lanes_node(provider: str, model: str):
                     knowledge_job = None
                 llm_text = ""
             else:
+                # Pick relevant past turns while retrieval lanes are still running.
+                recall_job = em.track(
+                    asyncio.create_task(
+                        recall_history(
+                            state.get("turn_memory") or [],
+                            history,
+                            state.get("text_query") or state.get("user_text", ""),
+                        )
+                    )
+                )
                 if knowledge_job and needs_context_first:
                     await knowledge_job
                     knowledge_job = None
                 context = tool_context_text()
-                has_media_blocks = any(t.get("kind") in {"image_gen", "tts", "doc"} for t in tasks)
+                has_media_blocks = any(t.get("kind") in {"image_gen", "tts", "doc"} and not is_knowledge(t) for t in tasks)
                 web_tasks = [t for t in tasks if t.get("kind") == "web"]
                 kb_tasks = [t for t in tasks if t.get("kind") == "kb_rag"]
                 has_arxiv_context = any("arxiv" in (t.get("sources") or []) for t in web_tasks)
@@ -461,13 +478,19 @@ def lanes_node(provider: str, model: str):
                 arxiv_items = arxiv_items_from_outs() if has_arxiv_context else []
                 kb_citations = kb_unique_citations() if has_kb_context else []
                 if arxiv_only_web and arxiv_items and not has_media_blocks:
+                    recall_job.cancel()
                     llm_text = await emit_text_tokens(render_arxiv_markdown(arxiv_items))
                 else:
                     query_text = state.get("text_query") or state.get("user_text", "")
                     ev_rows = ranked_evidence(query_text)
                     ev_text = evidence_text(ev_rows)
                     conflicts = conflict_signals(query_text, ev_rows)
-                    prompt = (
+                    # Findings from earlier vision calls answer follow-ups without a new vision call.
+                    has_vision = any(t.get("kind") == "vision" for t in tasks)
+                    notes = "" if has_vision else await asyncio.to_thread(image_notes, state.get("attachments") or [], artifact_memory)
+                    # Stable prefix first (rules for this task mix, then history) so provider
+                    # prefix caches hit across turns; everything per-turn goes in the suffix.
+                    rules = (
                         "You are OmniAgent. Answer directly in markdown.\n"
                         "If tool outputs are present, treat them as completed results and do not say you cannot perform generation.\n"
                         "Never output internal labels/headers like CHAT_HISTORY or TOOL_CONTEXT.\n"
@@ -478,12 +501,12 @@ def lanes_node(provider: str, model: str):
                         "Do NOT mention that files/audio/images were generated; the UI shows tool blocks separately.\n"
                     )
                     if has_media_blocks:
-                        prompt += (
+                        rules += (
                             "If media/doc tool blocks are present, do not output markdown image/audio/doc links or placeholder URLs.\n"
                             "Do not invent URLs (especially example.com). The UI already renders generated media blocks.\n"
                         )
                     if has_arxiv_context:
-                        prompt += (
+                        rules += (
                             "Start your response with this exact heading on the first line: ## Results from Arxiv\n"
                             "Then provide concise answer content.\n"
                             "If WEB context includes paper entries, list those papers with their real URLs.\n"
@@ -492,7 +515,7 @@ def lanes_node(provider: str, model: str):
                             "Each title must be paired with its own URL from the same paper entry.\n"
                         )
                     elif has_web_context:
-                        prompt += (
+                        rules += (
                             "Start your response with this exact heading on the first line: ## Results from Web\n"
                             "Return ONLY a short numbered list (max 5 items), with this exact per-item layout:\n"
                             "1. **Headline:** <title>\n"
@@ -502,11 +525,11 @@ def lanes_node(provider: str, model: str):
                             "Use only URLs present in tool context and skip vague/generic results.\n"
                         )
                     if has_web_context or has_arxiv_context:
-                        prompt += (
+                        rules += (
                             "For links, only use URLs explicitly present in tool context/citations. Never invent or guess URLs.\n"
                         )
                     if has_kb_context:
-                        prompt += (
+                        rules += (
                             "The question targets the Insurellm knowledge base.\n"
                             "Use KB_RAG context as the source of truth.\n"
                             "If the question names a specific person/entity, answer only for that exact entity.\n"
@@ -514,10 +537,8 @@ def lanes_node(provider: str, model: str):
                             "Do not copy large raw chunks verbatim; synthesize a concise answer.\n"
                             "Do NOT include a Sources/Citations section in the answer.\n"
                         )
-                    if conflicts:
-                        prompt += "Conflict alerts:\n" + "\n".join(f"- {c}" for c in conflicts) + "\n"
-                    prompt += (
-                        f"{state.get('text_instructions','')}\n\n"
+                    suffix = (
+                        (f"{state.get('text_instructions')}\n\n" if state.get("text_instructions") else "")
                         + (
                             "Agent collaboration contract:\n"
                             f"Researcher brief:\n{response_contract.get('researcher_brief','')}\n\n"
@@ -526,11 +547,25 @@ def lanes_node(provider: str, model: str):
                             if response_contract
                             else ""
                         )
-                        + f"Conversation so far:\n{history_text()}\n\n"
+                        + ("Conflict alerts:\n" + "\n".join(f"- {c}" for c in conflicts) + "\n\n" if conflicts else "")
                         + (f"Useful context from tools:\n{context}\n\n" if context else "")
+                        + (f"Earlier image analysis (attached images):\n{notes}\n\n" if notes else "")
                         + (f"Ranked evidence (top 5):\n{ev_text}\n\n" if ev_text else "")
                         + f"User message:\n{state.get('text_query') or state.get('user_text','')}\n"
                     )
+                    # Recalled turns depend on the query, so they go in the volatile suffix;
+                    # the cached prefix keeps only the chronological recent window.
+                    recalled = await recall_job
+                    if recalled:
+                        suffix = (
+                            "Relevant earlier turns (recalled from this conversation):\n"
+                            + "\n".join(f"{m.get('role', 'user')}: {m.get('content', '')}" for m in recalled)
+                            + "\n\n"
+                            + suffix
+                        )
+                    prompt = build_cached_messages(
+                        text_provider, rules, history, suffix, summary=str(state.get("history_summary") or "")
+                    )
                     high_conflict = bool(conflicts)
                     rewrite_budget = int((runtime or {}).get("max_rewrites", 0))
                     if high_conflict and rewrite_budget > 0:
@@ -546,6 +581,9 @@ def lanes_node(provider: str, model: str):
                         )
                         final_msg = llm.invoke(review_prompt)
                         reviewed = (getattr(final_msg, "content", "") or "").strip() or draft
+                        usage = add_usage(empty_usage(), getattr(draft_msg, "usage_metadata", None))
+                        add_usage(usage, getattr(final_msg, "usage_metadata", None))
+                        em.emit("usage", {"provider": text_provider, "model": text_model, **usage})
                         llm_text = await emit_text_tokens(reviewed)
                     else:
                         llm_text = await stream_tokens(prompt, em, provider=text_provider, model=text_model, temperature=0.2)
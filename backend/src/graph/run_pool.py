@@ -0,0 +1,129 @@
+# graph/run_pool.py
+from __future__ import annotations
+import asyncio
+import os
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+from backend.src.core.logging import get_logger
+
+log = get_logger("omniagent.run_pool")
+
+Job = Tuple[str, Callable[[], Awaitable[None]], Callable[[], None], Optional[str]]
+
+
+class RunPool:
+    """Bounded worker pool for graph runs, independent of HTTP request lifetimes.
+
+    At most `workers` runs execute at once; up to `max_pending` more wait in FIFO
+    order. Workers start lazily on first submit (they need a running loop).
+
+    Jobs sharing a `key` (a session) run one at a time in submission order. A job
+    whose key is busy is parked instead of occupying a worker, and runs as soon as
+    the job ahead of it finishes.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = max(1, int(workers))
+        self._jobs: asyncio.Queue[Job] | None = None
+        self._max_pending = max(1, int(max_pending))
+        self._running: Dict[str, asyncio.Task] = {}
+        self._pending: Dict[str, Callable[[], None]] = {}
+        self._dropped: Set[str] = set()
+        self._threads: list[asyncio.Task] = []
+        self._parked: Dict[str, Deque[Job]] = {}
+
+    def _ensure_started(self) -> asyncio.Queue:
+        if self._jobs is None:
+            self._jobs = asyncio.Queue(maxsize=self._max_pending)
+            self._threads = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self._jobs
+
+    def submit(
+        self, run_id: str, fn: Callable[[], Awaitable[None]], on_drop: Callable[[], None], key: Optional[str] = None
+    ) -> bool:
+        """Queue `fn` for execution; False when the pending queue is full.
+
+        `on_drop` runs instead of `fn` if the run is cancelled while still pending.
+        """
+        jobs = self._ensure_started()
+        if len(self._pending) >= self._max_pending:
+            return False  # parked jobs count too, not only those still in the queue
+        try:
+            jobs.put_nowait((run_id, fn, on_drop, key))
+        except asyncio.QueueFull:
+            return False
+        self._pending[run_id] = on_drop
+        return True
+
+    def cancel(self, run_id: str) -> bool:
+        t = self._running.get(run_id)
+        if t is not None:
+            t.cancel()
+            return True
+        on_drop = self._pending.pop(run_id, None)
+        if on_drop is not None:
+            self._dropped.add(run_id)
+            on_drop()
+            return True
+        return False
+
+    def state(self, run_id: str) -> Optional[str]:
+        if run_id in self._running:
+            return "running"
+        if run_id in self._pending:
+            return "queued"
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": len(self._running),
+            "queued": len(self._pending),
+            "max_pending": self._max_pending,
+        }
+
+    async def _worker(self) -> None:
+        assert self._jobs is not None
+        while True:
+            job: Optional[Job] = await self._jobs.get()
+            key = job[3]
+            if key is not None:
+                if key in self._parked:
+                    self._parked[key].append(job)  # same session already running: wait off-worker
+                    continue
+                self._parked[key] = deque()
+            while job is not None:
+                await self._run(job)
+                # Hand the key to the next parked job of the same session, in order.
+                job = self._parked[key].popleft() if key is not None and self._parked[key] else None
+            if key is not None:
+                self._parked.pop(key, None)
+
+    async def _run(self, job: Job) -> None:
+        run_id, fn = job[0], job[1]
+        if run_id in self._dropped:
+            self._dropped.discard(run_id)
+            return
+        self._pending.pop(run_id, None)
+        t = asyncio.create_task(fn())
+        self._running[run_id] = t
+        try:
+            # wait() instead of await: a cancelled run must not take the worker down.
+            await asyncio.wait([t])
+            if not t.cancelled() and t.exception() is not None:
+                log.warning("run_id=%s job failed: %s", run_id, t.exception())
+        finally:
+            self._running.pop(run_id, None)
+
+
+_POOL: Dict[str, Any] = {"pool": None}
+
+
+def get_run_pool() -> RunPool:
+    if _POOL["pool"] is None:
+        _POOL["pool"] = RunPool(
+            workers=int(os.getenv("RUN_WORKERS", "4")),
+            max_pending=int(os.getenv("RUN_QUEUE_MAX", "64")),
+        )
+    return _POOL["pool"]
@@ -1,9 +1,11 @@
 # graph/runner.py
 from __future__ import annotations
+import asyncio
 from typing import Any, Dict, Callable, Optional
 
 from langgraph.graph import StateGraph, END
 
+from backend.src.core.logging import get_logger
 from backend.src.schemas.state import AgentState
 from backend.src.stream.emitter import Emitter
 from backend.src.graph.ack_node import ack_node
@@ -18,6 +20,8 @@ from backend.src.graph.lanes_node import lanes_node
 from backend.src.graph.reflect_node import reflect_node
 from backend.src.schemas.plan import RunPlan
 
+log = get_logger("omniagent.runner")
+
 
 def _needs_tools(plan: RunPlan) -> bool:
     flags = plan.flags or {}
@@ -109,8 +113,15 @@ async def run_graph(app, state: Dict[str, Any], send: Callable[[Dict[str, Any]],
     try:
         out = await app.ainvoke(state)
         em.emit("run_end", {"ok": True})
+        log.info("run_id=%s trace_id=%s outcome=ok", run_id, trace_id)
         return out
+    except asyncio.CancelledError:
+        # Client went away: stop lane tasks and let thread-bound agents bail out early.
+        em.cancel()
+        log.info("run_id=%s trace_id=%s outcome=cancelled", run_id, trace_id)
+        raise
     except Exception as e:
         em.emit("error", {"error": str(e)})
         em.emit("run_end", {"ok": False})
+        log.info("run_id=%s trace_id=%s outcome=error error=%s", run_id, trace_id, e)
         return {"final_text": "", "tool_outputs": {}, "error": str(e)}
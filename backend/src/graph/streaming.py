@@ -1,30 +1,38 @@
 # graph/streaming.py
 from __future__ import annotations
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from backend.src.llm.factory import get_llm, is_not_found_error, model_candidates
+from backend.src.llm.prompt_cache import add_usage, empty_usage
 from backend.src.stream.emitter import Emitter
 
 
 async def stream_tokens(
-    prompt: str,
+    prompt: Any,
     em: Emitter,
     provider: str,
     model: str,
     temperature: float = 0.2,
 ) -> str:
-    """Provider-agnostic token streaming with model-id fallback retries on 404/not-found."""
+    """Provider-agnostic token streaming with model-id fallback retries on 404/not-found.
+
+    `prompt` may be a plain string or a list of chat messages. Token usage (including
+    provider prefix-cache hits) is reported once per stream as a `usage` event.
+    """
     last_err: Optional[Exception] = None
     for idx, candidate in enumerate(model_candidates(provider, model)):
         llm = get_llm(provider, candidate, streaming=True, temperature=temperature)
-        acc = ""
+        parts: list[str] = []
+        usage = empty_usage()
         try:
             async for chunk in llm.astream(prompt):
+                add_usage(usage, getattr(chunk, "usage_metadata", None))
                 tok = getattr(chunk, "content", "") or ""
                 if tok:
-                    acc += tok
+                    parts.append(tok)
                     em.emit("token", {"text": tok})
-            return acc
+            em.emit("usage", {"provider": provider, "model": candidate, **usage})
+            return "".join(parts)
         except Exception as e:
             last_err = e
             if idx < len(model_candidates(provider, model)) - 1 and is_not_found_error(e):
@@ -33,3 +41,45 @@ async def stream_tokens(
     if last_err:
         raise last_err
     return ""
+
+
+def stream_block(
+    prompt: Any,
+    em: Emitter,
+    block_id: str,
+    provider: str,
+    model: str,
+    temperature: float = 0.2,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """Blocking variant of stream_tokens for agents running in worker threads.
+
+    Tokens go to the task's own block as `block_token` events (and to `on_token`),
+    so several lanes can stream side by side. Checks for cancellation per token.
+    """
+    last_err: Optional[Exception] = None
+    candidates = model_candidates(provider, model)
+    for idx, candidate in enumerate(candidates):
+        llm = get_llm(provider, candidate, streaming=True, temperature=temperature)
+        parts: list[str] = []
+        usage = empty_usage()
+        try:
+            for chunk in llm.stream(prompt):
+                em.check_cancelled()
+                add_usage(usage, getattr(chunk, "usage_metadata", None))
+                tok = getattr(chunk, "content", "") or ""
+                if tok:
+                    parts.append(tok)
+                    em.emit("block_token", {"block_id": block_id, "text": tok})
+                    if on_token is not None:
+                        on_token(tok)
+            em.emit("usage", {"provider": provider, "model": candidate, **usage})
+            return "".join(parts)
+        except Exception as e:
+            last_err = e
+            if not parts and idx < len(candidates) - 1 and is_not_found_error(e):
+                continue
+            raise
+    if last_err:
+        raise last_err
+    return ""
@@ -5,10 +5,11 @@ from typing import Any, Dict, List, Tuple
 from backend.src.graph.agent_memory import push_note
 
 
-def _task_key(t: Dict[str, Any]) -> Tuple[str, str]:
+def _task_key(t: Dict[str, Any]) -> Tuple[str, str, str]:
     kind = str(t.get("kind", ""))
     anchor = str(t.get("query") or t.get("prompt") or t.get("text") or t.get("instruction") or "")
-    return kind, anchor.strip().lower()
+    # Same ask about different attachments (e.g. one summary per document) is not a duplicate.
+    return kind, anchor.strip().lower(), str(t.get("attachment_id") or "")
 
 
 def task_validate_node():
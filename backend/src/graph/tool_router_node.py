@@ -1,11 +1,13 @@
 # graph/tool_router_node.py
 from __future__ import annotations
+import os
 import re
 from typing import Any, Dict, List
 from uuid import uuid4
 
 from backend.src.graph.agent_memory import push_note
 from backend.src.schemas.plan import RunPlan
+from backend.src.tools.media.artifact_cache import wants_fresh
 
 
 def _extract_quoted(text: str) -> str:
@@ -31,6 +33,19 @@ def _strip_prefixes(text: str, prefixes: List[str]) -> str:
     return s
 
 
+# Explicit whole-document summary requests only: a summary word aimed at the document
+# itself ("summarize the attached pdf", "overview of this file") or a bare "summarize
+# it" / "tl;dr". Anything narrower ("summarize section 3", "the overall cost") stays
+# on retrieval.
+_DOC_NOUN = r"(document|doc|pdf|file|paper|report|attachment|upload)s?"
+_DOC_FILLER = r"(?:\s+(?:of|for|on|in|from|the|this|that|these|those|my|our|attached|uploaded|whole|entire|full|complete))*"
+_SUMMARY_WORD = r"(summar(y|ies|ize|ise|izing|ising)|overview|tl;?dr|gist|main (points|ideas|themes)|key (points|takeaways|findings))"
+_WHOLE_DOC_RE = re.compile(
+    rf"\b{_SUMMARY_WORD}{_DOC_FILLER}\s+{_DOC_NOUN}\b"
+    rf"|\b{_DOC_NOUN}(?:'s)?\s+{_SUMMARY_WORD}\b"
+    r"|^\W*(please\s+)?(summari[sz]e(\s+(it|this|that|them))?|tl;?dr|give me (a|an) (summary|overview))\W*$",
+    re.IGNORECASE,
+)
 _NEXT_ACTION = r"(?=(?:\s*,|\s+and\s+|\s+also\s+|\s+then\s+)\s*(?:generate|create|make|explain|tell|write|summarize|what is)\b|$)"
 
 
@@ -107,7 +122,16 @@ def tool_router_node():
             })
 
         if flags.get("needs_rag"):
-            tasks.append({"id": str(uuid4())[:8], "kind": "rag", "query": user_text, "top_k": 5})
+            docs = [a for a in state.get("attachments", []) if a.get("kind") == "doc"]
+            if docs and _WHOLE_DOC_RE.search(user_text):
+                # Top-k chunks cannot cover a summary of the whole file: map-reduce it instead.
+                for d in docs:
+                    tasks.append({
+                        "id": str(uuid4())[:8], "kind": "doc", "instruction": "summarize",
+                        "attachment_id": d["id"], "prompt": user_text,
+                    })
+            else:
+                tasks.append({"id": str(uuid4())[:8], "kind": "rag", "query": user_text, "top_k": 5})
         if flags.get("needs_kb_rag"):
             tasks.append({"id": str(uuid4())[:8], "kind": "kb_rag", "query": user_text, "top_k": 6})
 
@@ -243,17 +267,25 @@ def tool_router_node():
             )
 
         if flags.get("needs_vision") and state.get("attachments"):
-            img = next((a for a in state["attachments"] if a.get("kind") == "image"), None)
-            if img:
+            imgs = [a for a in state["attachments"] if a.get("kind") == "image"]
+            imgs = imgs[-int(os.getenv("VISION_MAX_IMAGES", "4")):]
+            if imgs:
                 tasks.append(
                     {
                         "id": str(uuid4())[:8],
                         "kind": "vision",
                         "prompt": user_text,
-                        "image_attachment_id": img["id"],
+                        "image_attachment_id": imgs[0]["id"],
+                        "image_attachment_ids": [a["id"] for a in imgs],
                     }
                 )
 
+        # One decision per turn: an explicit regenerate ask bypasses every artifact cache.
+        if wants_fresh(user_text):
+            for t in tasks:
+                if t.get("kind") in {"image_gen", "tts", "doc", "vision"}:
+                    t["regenerate"] = True
+
         plan.tool_tasks = tasks
         return {
             "plan": plan.model_dump(),
@@ -2,9 +2,13 @@
 from __future__ import annotations
 from langchain_openai import ChatOpenAI
 
+from backend.src.core.http import http_client
 from backend.src.llm.base import common_kwargs, require_env
 
 
 def build_openai(model: str, streaming: bool, temperature: float):
     require_env("OPENAI_API_KEY")
-    return ChatOpenAI(model=model, **common_kwargs(streaming, temperature))
+    # stream_usage: report token/cache usage on streamed responses too.
+    # Sync calls (agents in worker threads) share the pooled transport; langchain already
+    # reuses one default async client for astream.
+    return ChatOpenAI(model=model, stream_usage=True, http_client=http_client("api.openai.com"), **common_kwargs(streaming, temperature))
@@ -0,0 +1,69 @@
+# llm/prompt_cache.py
+from __future__ import annotations
+import os
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+
+# Providers that need explicit cache breakpoints. OpenAI and Gemini cache
+# identical prompt prefixes automatically, so only the layout matters there.
+_EXPLICIT_CACHE_PROVIDERS = {"anthropic"}
+
+
+def _text_block(text: str, cache: bool) -> List[Dict[str, Any]]:
+    block: Dict[str, Any] = {"type": "text", "text": text}
+    if cache:
+        block["cache_control"] = {"type": "ephemeral"}
+    return [block]
+
+
+def build_cached_messages(
+    provider: str,
+    system_rules: str,
+    history: List[Dict[str, str]],
+    suffix: str,
+    summary: str = "",
+) -> List[BaseMessage]:
+    """Lay out a prompt as stable prefix (rules, summary, history) + volatile suffix.
+
+    The prefix only changes when the rule set, the rolling summary or the history
+    changes, so repeated turns hit provider-side prefix caches. For providers that
+    need explicit markers, breakpoints are placed after the rules and after the
+    last history turn.
+    """
+    # get_llm falls back to OpenAI when the provider key is missing; only mark when it won't.
+    mark = (provider or "").lower() in _EXPLICIT_CACHE_PROVIDERS and bool(os.getenv("ANTHROPIC_API_KEY"))
+    summary_text = f"Summary of earlier conversation:\n{summary.strip()}" if (summary or "").strip() else ""
+    if mark:
+        system: Any = _text_block(system_rules, True) + ([{"type": "text", "text": summary_text}] if summary_text else [])
+    else:
+        system = system_rules + (f"\n{summary_text}\n" if summary_text else "")
+    msgs: List[BaseMessage] = [SystemMessage(content=system)]
+    rows = [m for m in history if str(m.get("content", "")).strip()]
+    for i, m in enumerate(rows):
+        content = str(m.get("content", ""))
+        last = i == len(rows) - 1
+        body: Any = _text_block(content, True) if (mark and last) else content
+        if m.get("role") == "assistant":
+            msgs.append(AIMessage(content=body))
+        else:
+            msgs.append(HumanMessage(content=body))
+    msgs.append(HumanMessage(content=suffix))
+    return msgs
+
+
+def empty_usage() -> Dict[str, int]:
+    return {"input_tokens": 0, "output_tokens": 0, "cached_tokens": 0, "cache_write_tokens": 0}
+
+
+def add_usage(acc: Dict[str, int], usage_metadata: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Fold one LangChain `usage_metadata` dict (from a message or stream chunk) into `acc`."""
+    if not usage_metadata:
+        return acc
+    details = usage_metadata.get("input_token_details") or {}
+    acc["input_tokens"] += int(usage_metadata.get("input_tokens") or 0)
+    acc["output_tokens"] += int(usage_metadata.get("output_tokens") or 0)
+    acc["cached_tokens"] += int(details.get("cache_read") or 0)
+    acc["cache_write_tokens"] += int(details.get("cache_creation") or 0)
+    return acc
@@ -6,8 +6,8 @@ from pydantic import BaseModel
 
 EventType = Literal[
     "run_start", "plan", "task_start", "task_result",
-    "token", "block_start", "block_token", "block_end",
-    "error", "run_end",
+    "token", "block_start", "block_token", "block_update", "block_end",
+    "usage", "error", "run_end",
 ]
 
 
@@ -17,3 +17,4 @@ class SSEEvent(BaseModel):
     trace_id: Optional[str] = None
     ts_ms: int
     data: Dict[str, Any] = {}
+    id: Optional[int] = None  # per-run sequence number, assigned when published
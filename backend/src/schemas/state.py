@@ -28,6 +28,8 @@ class AgentState(TypedDict, total=False):
     attachments: List[Attachment]
 
     chat_history: List[Dict[str, str]]
+    history_summary: str
+    turn_memory: List[Dict[str, Any]]
     artifact_memory: Dict[str, Any]
     context_bundle: Dict[str, Any]
     linked_artifact: Dict[str, Any]
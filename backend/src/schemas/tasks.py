@@ -38,6 +38,8 @@ class VisionTask(BaseTask):
     kind: Literal["vision"] = "vision"
     prompt: str
     image_attachment_id: str
+    image_attachment_ids: List[str] = []  # extra images analyzed in the same request
+    regenerate: bool = False
 
 
 class ImageGenTask(BaseTask):
@@ -45,12 +47,14 @@ class ImageGenTask(BaseTask):
     prompt: str
     size: Literal["512x512", "1024x1024"] = "1024x1024"
     subject_lock: Optional[str] = None
+    regenerate: bool = False
 
 
 class AudioTask(BaseTask):
     kind: Literal["tts"] = "tts"
     text: str
     voice: str = "alloy"
+    regenerate: bool = False
 
 
 class DocTask(BaseTask):
@@ -59,6 +63,7 @@ class DocTask(BaseTask):
     attachment_id: Optional[str] = None
     prompt: Optional[str] = None
     format: Literal["pdf", "doc", "txt", "md"] = "txt"
+    regenerate: bool = False
 
 
 Task = Annotated[
@@ -0,0 +1,249 @@
+# session/disk_gc.py
+from __future__ import annotations
+import asyncio
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+from backend.src.core.logging import get_logger
+from backend.src.session.store import drain_expired, peek_session, session_busy, session_exists
+from backend.src.tools.media.assets import PARTIAL_SUFFIX
+from backend.src.tools.media.blobs import BLOBS_DIR, DERIVED_DIR
+
+
+UPLOADS_DIR = Path("backend/data/uploads")
+SESSIONS_DIR = Path("backend/data/sessions")
+STALE_PARTIAL_SECS = 3600.0
+
+log = get_logger("omniagent.gc")
+
+_STATS: Dict[str, Any] = {
+    "runs": 0,
+    "bytes_reclaimed": 0,
+    "files_reclaimed": 0,
+    "sessions_reclaimed": 0,
+    "bytes_in_use": 0,
+    "last_run_ms": 0.0,
+}
+# Last read time per file/index path; mtime alone would make LRU "least recently written".
+_ACCESS: Dict[str, float] = {}
+
+# (last use, bytes, path): one upload/asset file, or a whole session RAG index.
+Unit = Tuple[float, int, Path]
+
+
+def touch(path: Any) -> None:
+    """Record a read so LRU eviction keeps recently served files."""
+    _ACCESS[str(path)] = time.time()
+
+
+def gc_stats() -> Dict[str, Any]:
+    return dict(_STATS)
+
+
+def _tree_size(p: Path) -> Tuple[int, float]:
+    size, newest = 0, 0.0
+    for root, _, files in os.walk(p):
+        for name in files:
+            try:
+                st = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            size += st.st_size
+            newest = max(newest, st.st_mtime)
+    return size, newest
+
+
+def _remove(path: Path) -> int:
+    if path.is_dir():
+        size, _ = _tree_size(path)
+        files = sum(len(f) for _, _, f in os.walk(path))
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        size, files = 0, 0
+        for p in (path, path.with_name(path.name + ".gz")):
+            try:
+                size += p.stat().st_size
+                p.unlink()
+                files += 1
+            except OSError:
+                continue
+    _ACCESS.pop(str(path), None)
+    _STATS["bytes_reclaimed"] += size
+    _STATS["files_reclaimed"] += files
+    return size
+
+
+def _drop_session(session_id: str) -> None:
+    found = False
+    for base in (UPLOADS_DIR, SESSIONS_DIR):
+        p = base / session_id
+        if p.exists():
+            _remove(p)
+            found = True
+    if found:
+        _STATS["sessions_reclaimed"] += 1
+
+
+def _units(session_id: str) -> List[Unit]:
+    out: List[Unit] = []
+    up = UPLOADS_DIR / session_id
+    if up.is_dir():
+        with os.scandir(up) as it:
+            files = {e.name: e.stat() for e in it if e.is_file()}
+        for name, st in files.items():
+            if name.endswith(".gz") and name[:-3] in files:
+                continue  # precompressed sidecar, accounted with its asset
+            if name.endswith(PARTIAL_SUFFIX):
+                # Asset still being written; a marker this old means the writer died.
+                if time.time() - st.st_mtime > STALE_PARTIAL_SECS:
+                    (up / name).unlink(missing_ok=True)
+                continue
+            gz = files.get(name + ".gz")
+            size = st.st_size + (gz.st_size if gz else 0)
+            out.append((max(st.st_mtime, _ACCESS.get(str(up / name), 0.0)), size, up / name))
+    rag = SESSIONS_DIR / session_id / "rag"
+    if rag.is_dir():
+        size, newest = _tree_size(rag)
+        out.append((max(newest, _ACCESS.get(str(rag), 0.0)), size, rag))
+    return out
+
+
+def _pinned(session_id: str) -> Set[str]:
+    """Upload files a live session still lists as attachments; never evicted."""
+    sess = peek_session(session_id) or {}
+    return {os.path.normpath(str(a["path"])) for a in sess.get("attachments") or [] if a.get("path")}
+
+
+def _session_ids() -> List[str]:
+    ids = set()
+    for base in (UPLOADS_DIR, SESSIONS_DIR):
+        if base.is_dir():
+            with os.scandir(base) as it:
+                ids.update(e.name for e in it if e.is_dir())
+    return sorted(ids)
+
+
+def _sweep(session_ids: List[str], session_quota: int, orphan_age: float) -> Tuple[List[Unit], int]:
+    """Drop orphaned sessions and trim each live one to its quota.
+
+    Returns the evictable units kept and the bytes held by pinned attachments.
+    """
+    kept: List[Unit] = []
+    pinned_bytes = 0
+    now = time.time()
+    for sid in session_ids:
+        units = _units(sid)
+        # Files of sessions the store no longer knows (e.g. lost on restart) go once idle.
+        if not session_exists(sid) and all(ts < now - orphan_age for ts, _, _ in units):
+            _drop_session(sid)
+            continue
+        pinned = _pinned(sid)
+        held = sum(size for _, size, path in units if os.path.normpath(str(path)) in pinned)
+        units = [u for u in units if os.path.normpath(str(u[2])) not in pinned]
+        units.sort()
+        used = held + sum(size for _, size, _ in units)
+        while units and used > session_quota:
+            _, size, path = units.pop(0)
+            _remove(path)
+            used -= size
+        kept.extend(units)
+        pinned_bytes += held
+    return kept, pinned_bytes
+
+
+def _evict_global(units: List[Unit], quota: int) -> int:
+    units.sort()
+    used = sum(size for _, size, _ in units)
+    for _, size, path in units:
+        if used <= quota:
+            break
+        _remove(path)
+        used -= size
+    return used
+
+
+def _sweep_blobs(min_age: float) -> None:
+    """Drop stored uploads no session links to any more, then their derived artifacts."""
+    now = time.time()
+    live = set()
+    if BLOBS_DIR.is_dir():
+        for shard in os.scandir(BLOBS_DIR):
+            if not shard.is_dir():
+                continue
+            for e in os.scandir(shard.path):
+                st = e.stat()
+                # ctime moves when a link is added or removed, so fresh uploads are safe.
+                if now - st.st_ctime < min_age:
+                    live.add(e.name.split(".", 1)[0])
+                elif shard.name == "tmp" or st.st_nlink <= 1:
+                    _remove(Path(e.path))
+                else:
+                    live.add(e.name.split(".", 1)[0])
+    if DERIVED_DIR.is_dir():
+        for shard in os.scandir(DERIVED_DIR):
+            if shard.is_dir():
+                for e in os.scandir(shard.path):
+                    if e.is_dir() and e.name not in live:
+                        _remove(Path(e.path))
+
+
+def _mb(name: str, default: str) -> int:
+    return int(float(os.getenv(name, default)) * 1024 * 1024)
+
+
+async def run_gc_once() -> Dict[str, Any]:
+    """One incremental pass: expired sessions, orphans, per-session then global quota,
+    then shared blobs whose last session link is gone.
+
+    Filesystem work runs in worker threads DISK_GC_BATCH sessions at a time, so the
+    event loop keeps serving requests. Sessions with a turn in flight are skipped, and
+    files a live session lists as attachments are only removed with the session.
+    """
+    t0 = time.perf_counter()
+    reclaimed_before = _STATS["bytes_reclaimed"]
+    session_quota = _mb("DISK_QUOTA_SESSION_MB", "512")
+    global_quota = _mb("DISK_QUOTA_MB", "4096")
+    orphan_age = float(os.getenv("SESSION_TTL_SECS", str(60 * 30)))
+    batch = max(1, int(os.getenv("DISK_GC_BATCH", "32")))
+
+    for sid in drain_expired():
+        # The id may have been reused since it expired; its files then belong to the
+        # new session and are left to the quota and orphan passes below.
+        if session_exists(sid) or session_busy(sid):
+            continue
+        await asyncio.to_thread(_drop_session, sid)
+
+    session_ids = [sid for sid in await asyncio.to_thread(_session_ids) if not session_busy(sid)]
+    kept: List[Unit] = []
+    pinned = 0
+    for i in range(0, len(session_ids), batch):
+        units, held = await asyncio.to_thread(_sweep, session_ids[i : i + batch], session_quota, orphan_age)
+        kept.extend(units)
+        pinned += held
+
+    # Attachments of live sessions count toward the quota but are never evicted.
+    _STATS["bytes_in_use"] = pinned + await asyncio.to_thread(_evict_global, kept, max(0, global_quota - pinned))
+    await asyncio.to_thread(_sweep_blobs, float(os.getenv("BLOB_GC_MIN_AGE_SECS", "600")))
+    _STATS["runs"] += 1
+    _STATS["last_run_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+    reclaimed = _STATS["bytes_reclaimed"] - reclaimed_before
+    if reclaimed:
+        log.info("disk gc reclaimed=%d in_use=%d sessions=%d ms=%.1f",
+                 reclaimed, _STATS["bytes_in_use"], len(session_ids), _STATS["last_run_ms"])
+    return gc_stats()
+
+
+async def gc_loop() -> None:
+    """Background service: run a GC pass every DISK_GC_INTERVAL_SECS (0 disables)."""
+    interval = float(os.getenv("DISK_GC_INTERVAL_SECS", "60"))
+    if interval <= 0:
+        return
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_gc_once()
+        except Exception:
+            log.exception("disk gc failed")
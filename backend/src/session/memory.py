@@ -0,0 +1,116 @@
+# session/memory.py
+from __future__ import annotations
+import asyncio
+import os
+from typing import Any, Dict, List, Set
+
+from backend.src.llm.factory import get_llm
+from backend.src.session.recall import MAX_TURNS, index_turn
+from backend.src.session.store import get_session, session_active, session_lock, update_session
+
+
+SUMMARY_MAX_CHARS = 2400
+
+# Sessions with a fold in progress; a turn finishing meanwhile does not start another.
+_FOLDING: Set[str] = set()
+
+
+def _keep_recent() -> int:
+    return max(2, int(os.getenv("HISTORY_KEEP_RECENT", "6")))
+
+
+def _fold_batch() -> int:
+    # Fold in batches so the summary (part of the cached prompt prefix) changes rarely.
+    return max(1, int(os.getenv("HISTORY_FOLD_BATCH", "4")))
+
+
+def needs_fold(sess: Dict[str, Any]) -> bool:
+    history = sess.get("chat_history") or []
+    return len(history) - _keep_recent() >= _fold_batch() and not sess.get("summary_pending")
+
+
+def _transcript(rows: List[Dict[str, str]]) -> str:
+    return "\n".join(f"{str(m.get('role', 'user')).upper()}: {m.get('content', '')}" for m in rows)
+
+
+async def fold_history(sess: Dict[str, Any], provider: str, model: str) -> None:
+    """Fold turns older than the recent window into the session's rolling summary.
+
+    Runs after a turn has finished streaming. Folded messages are removed from
+    `chat_history`, so prompts carry one bounded summary plus a few verbatim turns.
+    """
+    if not needs_fold(sess):
+        return
+    sess["summary_pending"] = True
+    try:
+        history = list(sess.get("chat_history") or [])
+        older = history[: len(history) - _keep_recent()]
+        prev = str(sess.get("history_summary") or "").strip()
+        mem_provider = os.getenv("MEMORY_PROVIDER", os.getenv("INTENT_PROVIDER", provider))
+        mem_model = os.getenv("MEMORY_MODEL", os.getenv("INTENT_MODEL", model))
+        llm = get_llm(mem_provider, mem_model, streaming=False, temperature=0.0)
+        prompt = (
+            "Update the running summary of a conversation between a user and an assistant.\n"
+            "Keep facts, names, decisions, user preferences, generated artifacts and open questions.\n"
+            "Drop pleasantries and verbatim long answers. Plain text, at most 12 short lines.\n\n"
+            f"Current summary:\n{prev or '(empty)'}\n\n"
+            f"New messages to fold in:\n{_transcript(older)}\n\n"
+            "Updated summary:"
+        )
+        msg = await llm.ainvoke(prompt)
+        summary = (getattr(msg, "content", "") or "").strip()
+        if not summary:
+            return
+        sess["history_summary"] = summary[:SUMMARY_MAX_CHARS]
+        # Messages appended while the summary was being written stay verbatim.
+        current = sess.get("chat_history") or []
+        if current[: len(older)] == older:
+            sess["chat_history"] = current[len(older):]
+    except Exception:
+        # Best-effort: on failure the verbatim window still caps history.
+        pass
+    finally:
+        sess["summary_pending"] = False
+
+
+async def update_memory(session_id: str, provider: str, model: str, user_text: str, assistant_text: str) -> None:
+    """Fold old history and index the finished turn without holding the session.
+
+    The LLM and embedding calls run on a snapshot, so the next turn and uploads are
+    never blocked by them; results are merged back in one short atomic update.
+    """
+    with session_active(session_id):
+        sess = get_session(session_id)
+        snap: Dict[str, Any] = {
+            "chat_history": list(sess.get("chat_history") or []),
+            "history_summary": sess.get("history_summary", ""),
+            "turn_memory": [],
+        }
+        before = list(snap["chat_history"])
+        fold = session_id not in _FOLDING and needs_fold(snap)
+        if fold:
+            _FOLDING.add(session_id)
+        try:
+            await asyncio.gather(
+                fold_history(snap, provider, model) if fold else asyncio.sleep(0),
+                index_turn(snap, user_text, assistant_text),
+            )
+        finally:
+            if fold:
+                _FOLDING.discard(session_id)
+        folded = before[: len(before) - len(snap["chat_history"])]
+        if not folded and not snap["turn_memory"]:
+            return
+
+        def merge(sess: Dict[str, Any]) -> None:
+            history = sess.get("chat_history") or []
+            if folded and history[: len(folded)] == folded:
+                sess["chat_history"] = history[len(folded):]
+                sess["history_summary"] = snap["history_summary"]
+            if snap["turn_memory"]:
+                turns = sess.setdefault("turn_memory", [])
+                turns.extend(snap["turn_memory"])
+                del turns[:-MAX_TURNS]
+
+        async with session_lock(session_id):
+            update_session(session_id, merge)
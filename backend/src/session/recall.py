@@ -0,0 +1,73 @@
+# session/recall.py
+from __future__ import annotations
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+from langchain_openai import OpenAIEmbeddings
+
+
+TURN_MAX_CHARS = 1500
+MAX_TURNS = 200
+
+
+def _embeddings(embedding_model: str = "text-embedding-3-small") -> OpenAIEmbeddings:
+    return OpenAIEmbeddings(model=embedding_model)
+
+
+def _as_vector(vec: Any) -> np.ndarray:
+    if isinstance(vec, (bytes, bytearray)):
+        return np.frombuffer(vec, dtype=np.float32)
+    return np.asarray(vec, dtype=np.float32)
+
+
+async def index_turn(sess: Dict[str, Any], user_text: str, assistant_text: str) -> None:
+    """Embed one finished user/assistant turn into the session's turn store (best-effort)."""
+    if not os.getenv("OPENAI_API_KEY") or not (user_text or "").strip():
+        return
+    user = (user_text or "").strip()[:TURN_MAX_CHARS]
+    assistant = (assistant_text or "").strip()[:TURN_MAX_CHARS]
+    try:
+        vec = await _embeddings().aembed_query(f"USER: {user}\nASSISTANT: {assistant}")
+    except Exception:
+        return
+    turns = sess.setdefault("turn_memory", [])
+    # float32 bytes: ~4x smaller than a list of floats in memory and in the session store.
+    turns.append({"user": user, "assistant": assistant, "vec": np.asarray(vec, dtype=np.float32).tobytes()})
+    del turns[:-MAX_TURNS]
+
+
+async def recall_history(
+    turns: List[Dict[str, Any]],
+    history: List[Dict[str, str]],
+    query: str,
+) -> List[Dict[str, str]]:
+    """Return the past turns most relevant to `query` that are not already in `history`.
+
+    Empty when there are too few older turns to choose from or embeddings are
+    unavailable. The result depends on the query, so callers keep it out of the
+    cached prompt prefix.
+    """
+    k = max(1, int(os.getenv("MEMORY_RECALL_K", "3")))
+    min_score = float(os.getenv("MEMORY_RECALL_MIN_SCORE", "0.25"))
+    in_window = {m.get("content") for m in history if m.get("role") == "user"}
+    candidates = [t for t in turns if t.get("vec") and t.get("user") not in in_window]
+    if len(candidates) <= k or not os.getenv("OPENAI_API_KEY") or not (query or "").strip():
+        return []
+    try:
+        qv = np.asarray(await _embeddings().aembed_query(query), dtype=np.float32)
+    except Exception:
+        return []
+
+    mat = np.stack([_as_vector(t["vec"]) for t in candidates])
+    denom = np.linalg.norm(mat, axis=1) * (np.linalg.norm(qv) or 1.0)
+    scores = (mat @ qv) / np.where(denom == 0, 1.0, denom)
+    top = [int(i) for i in np.argsort(-scores)[:k] if scores[i] >= min_score]
+
+    out: List[Dict[str, str]] = []
+    for i in sorted(top):  # chronological order reads naturally
+        t = candidates[i]
+        out.append({"role": "user", "content": t.get("user", "")})
+        if t.get("assistant"):
+            out.append({"role": "assistant", "content": t["assistant"]})
+    return out
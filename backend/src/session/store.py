@@ -1,35 +1,275 @@
 # session/store.py
 from __future__ import annotations
+import asyncio
+import contextlib
+import heapq
+import os
+import pickle
+import sqlite3
+import threading
 import time
-from typing import Any, Dict
+import weakref
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
 
 
-_sessions: Dict[str, Dict[str, Any]] = {}
 TTL_SECS = 60 * 30
 
+# Ids of sessions evicted by cleanup(), drained by the disk GC to delete their files.
+_EXPIRED: Deque[str] = deque(maxlen=10_000)
+
+
+def _ttl() -> float:
+    return float(os.getenv("SESSION_TTL_SECS", str(TTL_SECS)))
+
 
 def _default_artifact_memory() -> Dict[str, Any]:
     return {"image": None, "audio": None, "doc": None, "lineage": {"image": [], "audio": [], "doc": []}}
 
 
-def get_session(session_id: str) -> Dict[str, Any]:
-    s = _sessions.get(session_id) or {
+def _new_session() -> Dict[str, Any]:
+    return {
         "chat_history": [],
         "attachments": [],
         "artifact_memory": _default_artifact_memory(),
         "ts": time.time(),
     }
+
+
+def _normalize(s: Dict[str, Any]) -> Dict[str, Any]:
+    s.setdefault("chat_history", [])
+    s.setdefault("attachments", [])
     s.setdefault("artifact_memory", _default_artifact_memory())
     if not isinstance(s["artifact_memory"], dict):
         s["artifact_memory"] = _default_artifact_memory()
     s["artifact_memory"].setdefault("lineage", {"image": [], "audio": [], "doc": []})
     s["ts"] = time.time()
-    _sessions[session_id] = s
     return s
 
 
+class MemoryStore:
+    """Sessions in this process. Expiry is driven by a min-heap of deadlines.
+
+    Every access pushes a fresh (deadline, id) entry; older entries for the same id
+    are skipped when popped, so `cleanup()` costs O(k log n) for k expired entries.
+    Sessions are returned live, so in-place mutations are visible immediately.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._data: Dict[str, Dict[str, Any]] = {}
+        self._deadline: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+
+    def _touch(self, session_id: str) -> None:
+        deadline = time.time() + self.ttl
+        self._deadline[session_id] = deadline
+        heapq.heappush(self._heap, (deadline, session_id))
+        if len(self._heap) > 2 * len(self._deadline) + 1024:
+            # Drop superseded entries so the heap stays O(live sessions).
+            self._heap = [(d, k) for k, d in self._deadline.items()]
+            heapq.heapify(self._heap)
+
+    def get(self, session_id: str) -> Dict[str, Any]:
+        s = self._data.get(session_id) or _new_session()
+        self._data[session_id] = _normalize(s)
+        self._touch(session_id)
+        return s
+
+    def save(self, session_id: str, s: Dict[str, Any]) -> None:
+        self._data[session_id] = s
+        self._touch(session_id)
+
+    def update(self, session_id: str, fn: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        s = self.get(session_id)
+        fn(s)
+        self.save(session_id, s)
+        return s
+
+    def has(self, session_id: str) -> bool:
+        return self._deadline.get(session_id, 0.0) > time.time()
+
+    def peek(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._data.get(session_id) if self.has(session_id) else None
+
+    def cleanup(self) -> List[str]:
+        now, expired = time.time(), []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, k = heapq.heappop(self._heap)
+            if self._deadline.get(k) == deadline:
+                self._deadline.pop(k, None)
+                self._data.pop(k, None)
+                expired.append(k)
+        return expired
+
+
+class SqliteStore:
+    """Durable sessions shared by every process that opens the same database file.
+
+    Sessions are pickled (server-written data only) and must be written back with
+    `save()`, or merged with `update()` when other processes may write the same
+    session. Expiry uses an index on `expires_at`, so `cleanup()` is a range delete.
+    """
+
+    def __init__(self, path: str, ttl: float):
+        self.ttl = ttl
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data BLOB NOT NULL, expires_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)")
+        self._mu = threading.Lock()
+
+    def _load(self, session_id: str) -> Dict[str, Any]:
+        row = self._db.execute(
+            "SELECT data FROM sessions WHERE id = ? AND expires_at > ?", (session_id, time.time())
+        ).fetchone()
+        s = _new_session()
+        if row is not None:
+            try:
+                s = pickle.loads(row[0])
+            except Exception:
+                pass
+        return _normalize(s)
+
+    def _store(self, session_id: str, s: Dict[str, Any]) -> None:
+        self._db.execute(
+            "INSERT INTO sessions (id, data, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at",
+            (session_id, pickle.dumps(s, protocol=pickle.HIGHEST_PROTOCOL), time.time() + self.ttl),
+        )
+
+    def get(self, session_id: str) -> Dict[str, Any]:
+        with self._mu:
+            s = self._load(session_id)
+            # Reads extend the lifetime, as in MemoryStore.
+            self._db.execute("UPDATE sessions SET expires_at = ? WHERE id = ?", (time.time() + self.ttl, session_id))
+        return s
+
+    def save(self, session_id: str, s: Dict[str, Any]) -> None:
+        with self._mu:
+            self._store(session_id, s)
+
+    def update(self, session_id: str, fn: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        """Read-modify-write in one IMMEDIATE transaction, so writers in other
+        processes sharing the file cannot interleave and drop each other's changes."""
+        with self._mu:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                s = self._load(session_id)
+                fn(s)
+                self._store(session_id, s)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return s
+
+    def has(self, session_id: str) -> bool:
+        with self._mu:
+            row = self._db.execute(
+                "SELECT 1 FROM sessions WHERE id = ? AND expires_at > ?", (session_id, time.time())
+            ).fetchone()
+        return row is not None
+
+    def peek(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._mu:
+            row = self._db.execute(
+                "SELECT data FROM sessions WHERE id = ? AND expires_at > ?", (session_id, time.time())
+            ).fetchone()
+        try:
+            return pickle.loads(row[0]) if row is not None else None
+        except Exception:
+            return None
+
+    def cleanup(self) -> List[str]:
+        with self._mu:
+            rows = self._db.execute("DELETE FROM sessions WHERE expires_at <= ? RETURNING id", (time.time(),)).fetchall()
+        return [r[0] for r in rows]
+
+
+_STORE: Dict[str, Any] = {"store": None}
+_LOCKS: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+_ACTIVE: Dict[str, int] = {}
+
+
+def get_store():
+    """Process-wide store: SESSION_STORE=sqlite (SESSION_DB_PATH) or memory (default)."""
+    if _STORE["store"] is None:
+        kind = os.getenv("SESSION_STORE", "memory").strip().lower()
+        if kind == "sqlite":
+            _STORE["store"] = SqliteStore(os.getenv("SESSION_DB_PATH", "backend/data/sessions.db"), _ttl())
+        elif kind == "memory":
+            _STORE["store"] = MemoryStore(_ttl())
+        else:
+            raise RuntimeError(f"Unknown SESSION_STORE: {kind}")
+    return _STORE["store"]
+
+
+def get_session(session_id: str) -> Dict[str, Any]:
+    return get_store().get(session_id)
+
+
+def save_session(session_id: str, s: Dict[str, Any]) -> None:
+    get_store().save(session_id, s)
+
+
+def update_session(session_id: str, fn: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+    """Apply `fn` to the current session and save it atomically (across processes
+    for SqliteStore). Use this for every merge into an existing session."""
+    return get_store().update(session_id, fn)
+
+
+def session_lock(session_id: str) -> asyncio.Lock:
+    """Per-session lock around short merges (turn results, uploads, memory upkeep).
+
+    Turns are serialized by the run pool instead. The merges themselves go through
+    `update_session`, which is atomic on its own; the lock orders writers in this
+    process and tells `session_busy` that a write is in progress.
+
+    Locks are per process; the entry disappears once nobody holds or waits on it.
+    """
+    lock: Optional[asyncio.Lock] = _LOCKS.get(session_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _LOCKS[session_id] = lock
+    return lock
+
+
+@contextlib.contextmanager
+def session_active(session_id: str) -> Iterator[None]:
+    """Mark a turn (or its memory upkeep) as in flight for `session_busy`."""
+    _ACTIVE[session_id] = _ACTIVE.get(session_id, 0) + 1
+    try:
+        yield
+    finally:
+        n = _ACTIVE.pop(session_id, 1) - 1
+        if n > 0:
+            _ACTIVE[session_id] = n
+
+
+def session_busy(session_id: str) -> bool:
+    """True while a turn is in flight or a writer holds the session's lock."""
+    lock = _LOCKS.get(session_id)
+    return _ACTIVE.get(session_id, 0) > 0 or (lock is not None and lock.locked())
+
+
+def session_exists(session_id: str) -> bool:
+    return get_store().has(session_id)
+
+
+def peek_session(session_id: str) -> Optional[Dict[str, Any]]:
+    """Read a live session without creating it or extending its lifetime (for maintenance)."""
+    return get_store().peek(session_id)
+
+
 def cleanup() -> None:
-    now = time.time()
-    for k in list(_sessions.keys()):
-        if now - _sessions[k].get("ts", now) > TTL_SECS:
-            _sessions.pop(k, None)
+    _EXPIRED.extend(get_store().cleanup())
+
+
+def drain_expired() -> List[str]:
+    out = list(_EXPIRED)
+    _EXPIRED.clear()
+    return out
@@ -0,0 +1,242 @@
+# stream/bus.py
+from __future__ import annotations
+import asyncio
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from backend.src.stream.event_queue import EventQueue
+from backend.src.stream.run_stream import get_run, open_run
+
+
+# Run events flow: producers -> bus.publish -> subscribers (SSE responses).
+# publish/close are sync and must run on the event loop thread; producers in worker
+# threads go through loop.call_soon_threadsafe. open/subscribe are async.
+
+
+class _LocalSubscription:
+    def __init__(self, rs, q: EventQueue):
+        self._rs, self._q = rs, q
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        return await self._q.get()
+
+    def detach(self) -> None:
+        """Stop receiving: ends `get()` and lets an unattended run be abandoned."""
+        self._rs.unsubscribe(self._q)
+        self._q.put_nowait(None)
+
+    def close(self) -> None:
+        self._rs.unsubscribe(self._q)
+
+    def stats(self) -> Dict[str, int]:
+        return self._q.stats()
+
+
+class InProcessBus:
+    """Default bus: run events live in this process's RunStream registry."""
+
+    async def open(self, run_id: str) -> None:
+        open_run(run_id)
+
+    def publish(self, run_id: str, ev: Dict[str, Any]) -> None:
+        rs = get_run(run_id)
+        if rs is not None:
+            rs.publish(ev)
+
+    def close(self, run_id: str) -> None:
+        rs = get_run(run_id)
+        if rs is not None:
+            rs.close()
+
+    def on_abandon(self, run_id: str, fn: Callable[[], None]) -> None:
+        """Call `fn` when the run's last subscriber leaves and nobody re-attaches in time."""
+        rs = get_run(run_id)
+        if rs is not None:
+            rs.on_abandon = fn
+
+    async def subscribe(self, run_id: str, after_id: int = 0) -> Optional[_LocalSubscription]:
+        rs = get_run(run_id)
+        if rs is None:
+            return None
+        return _LocalSubscription(rs, rs.subscribe(after_id))
+
+
+# Background writers/watchers, referenced until done: a collected _writer would never
+# append the eof entry and leave subscribers waiting.
+_TASKS: Set[asyncio.Task] = set()
+
+
+def _spawn(coro: Awaitable[Any]) -> asyncio.Task:
+    task = asyncio.ensure_future(coro)
+    _TASKS.add(task)
+    task.add_done_callback(_TASKS.discard)
+    return task
+
+
+def _presence_secs() -> float:
+    return float(os.getenv("BUS_PRESENCE_SECS", "5"))
+
+
+class _RedisSubscription:
+    def __init__(self, r, key: str, after_id: int, queue_size: int):
+        self._r, self._key = r, key
+        self._last = f"{int(after_id)}-0"
+        self._q = EventQueue(maxsize=queue_size)
+        self._token = os.urandom(8).hex()
+        # Read in a background task so callers may cancel get() (timeouts) without
+        # interrupting a blocking XREAD mid-command.
+        self._reader = asyncio.create_task(self._read())
+        self._presence = asyncio.create_task(self._beat())
+
+    async def _read(self) -> None:
+        try:
+            while True:
+                res = await self._r.xread({self._key: self._last}, block=5000, count=512)
+                if not res and not await self._r.exists(self._key):
+                    return
+                for _, entries in res or []:
+                    for eid, fields in entries:
+                        self._last = eid
+                        if "eof" in fields:
+                            return
+                        if "ev" in fields:
+                            self._q.put_nowait(json.loads(fields["ev"]))
+        finally:
+            self._q.put_nowait(None)
+
+    async def _beat(self) -> None:
+        # Presence for the node running the run: one scored member per live subscriber.
+        subs = self._key + ":subs"
+        every = _presence_secs()
+        while True:
+            await self._r.zadd(subs, {self._token: time.time()})
+            await self._r.expire(subs, int(every * 4) + 1)
+            await asyncio.sleep(every)
+
+    def _leave(self) -> None:
+        self._reader.cancel()
+        if self._token:
+            self._presence.cancel()
+            _spawn(self._r.zrem(self._key + ":subs", self._token))
+            self._token = ""
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        return await self._q.get()
+
+    def detach(self) -> None:
+        self._leave()
+
+    def close(self) -> None:
+        self._leave()
+
+    def stats(self) -> Dict[str, int]:
+        return self._q.stats()
+
+
+class RedisBus:
+    """Cross-process bus on Redis Streams (any Redis-compatible server).
+
+    Each run is one stream keyed `omniagent:run:<id>` whose entry ids are the event
+    ids, so Last-Event-ID maps directly onto XREAD. The stream is trimmed to
+    SSE_REPLAY_EVENTS entries and expires SSE_RUN_RETAIN_SECS after the run ends.
+
+    Subscribers on any node refresh their entry in `<key>:subs` every
+    BUS_PRESENCE_SECS; the node running the run treats a subscriber as gone after
+    three missed beats and abandons the run once none is left for
+    SSE_RESUME_GRACE_SECS, like InProcessBus.
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError("Missing package: redis (required when EVENT_BUS_URL is set)") from e
+        self._r = aioredis.from_url(url, decode_responses=True)
+        self._outbox: Dict[str, asyncio.Queue] = {}
+        self._seq: Dict[str, int] = {}
+
+    @staticmethod
+    def _key(run_id: str) -> str:
+        return f"omniagent:run:{run_id}"
+
+    async def open(self, run_id: str) -> None:
+        # Marker entry so other nodes can see the run before its first event.
+        await self._r.xadd(self._key(run_id), {"open": "1"}, id="0-1")
+        self._seq[run_id] = 0
+        q: asyncio.Queue = asyncio.Queue()
+        self._outbox[run_id] = q
+        _spawn(self._writer(run_id, q))
+
+    def publish(self, run_id: str, ev: Dict[str, Any]) -> None:
+        q = self._outbox.get(run_id)
+        if q is None:
+            return
+        self._seq[run_id] += 1
+        ev["id"] = self._seq[run_id]
+        q.put_nowait(ev)
+
+    def close(self, run_id: str) -> None:
+        q = self._outbox.pop(run_id, None)
+        if q is not None:
+            q.put_nowait(None)
+
+    async def _writer(self, run_id: str, q: asyncio.Queue) -> None:
+        # Single writer per run keeps XADD order equal to publish order.
+        key = self._key(run_id)
+        maxlen = int(os.getenv("SSE_REPLAY_EVENTS", "4096"))
+        last = 0
+        try:
+            while True:
+                ev = await q.get()
+                if ev is None:
+                    break
+                last = int(ev["id"])
+                await self._r.xadd(key, {"ev": json.dumps(ev, ensure_ascii=False)}, id=f"{last}-0", maxlen=maxlen, approximate=True)
+        finally:
+            self._seq.pop(run_id, None)
+            await self._r.xadd(key, {"eof": "1"}, id=f"{last + 1}-0")
+            await self._r.expire(key, int(float(os.getenv("SSE_RUN_RETAIN_SECS", "300"))))
+
+    def on_abandon(self, run_id: str, fn: Callable[[], None]) -> None:
+        """Call `fn` when no subscriber on any node has been present for the grace period."""
+        if run_id in self._outbox:
+            _spawn(self._watch_presence(run_id, fn))
+
+    async def _watch_presence(self, run_id: str, fn: Callable[[], None]) -> None:
+        subs = self._key(run_id) + ":subs"
+        every = _presence_secs()
+        grace = float(os.getenv("SSE_RESUME_GRACE_SECS", "15"))
+        idle_since: Optional[float] = time.monotonic()  # the creating request subscribes right after this
+        while run_id in self._outbox:
+            await asyncio.sleep(every)
+            try:
+                await self._r.zremrangebyscore(subs, "-inf", time.time() - 3 * every)
+                present = await self._r.zcard(subs)
+            except Exception:
+                continue  # Redis hiccup: never cancel a run on missing information
+            if present:
+                idle_since = None
+            elif idle_since is None:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since >= grace and run_id in self._outbox:
+                fn()
+                return
+
+    async def subscribe(self, run_id: str, after_id: int = 0) -> Optional[_RedisSubscription]:
+        key = self._key(run_id)
+        if not await self._r.exists(key):
+            return None
+        return _RedisSubscription(self._r, key, after_id, queue_size=int(os.getenv("SSE_QUEUE_MAX", "256")))
+
+
+_BUS: Dict[str, Any] = {"bus": None}
+
+
+def get_bus():
+    """Process-wide bus: RedisBus when EVENT_BUS_URL is set, else InProcessBus."""
+    if _BUS["bus"] is None:
+        url = os.getenv("EVENT_BUS_URL", "").strip()
+        _BUS["bus"] = RedisBus(url) if url else InProcessBus()
+    return _BUS["bus"]
@@ -1,15 +1,62 @@
 # stream/emitter.py
 from __future__ import annotations
+import asyncio
+import threading
 import time
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, get_args
 
-from backend.src.schemas.events import SSEEvent
+from backend.src.schemas.events import EventType
+
+
+_EVENT_TYPES = frozenset(get_args(EventType))
+
+
+class RunCancelled(Exception):
+    """Raised by cooperative checks once the run's client has gone away."""
 
 
 class Emitter:
     def __init__(self, run_id: str, trace_id: Optional[str], send: Callable[[Dict[str, Any]], None]):
         self.run_id, self.trace_id, self.send = run_id, trace_id, send
+        self._cancelled = threading.Event()
+        self._tasks: List[asyncio.Task] = []
 
     def emit(self, type_: str, data: Dict[str, Any]) -> None:
-        ev = SSEEvent(type=type_, run_id=self.run_id, trace_id=self.trace_id, ts_ms=int(time.time() * 1000), data=data)
-        self.send(ev.model_dump())
+        if self._cancelled.is_set():
+            return
+        # Hot path (one call per token): build the SSEEvent-shaped dict directly
+        # instead of validating a pydantic model and dumping it again.
+        if type_ not in _EVENT_TYPES:
+            raise ValueError(f"Unknown event type: {type_}")
+        self.send(
+            {
+                "type": type_,
+                "run_id": self.run_id,
+                "trace_id": self.trace_id,
+                "ts_ms": time.time_ns() // 1_000_000,
+                "data": dict(data) if data else {},
+            }
+        )
+
+    # Cancellation: the emitter is the one per-run handle every node and agent
+    # already receives, so it also carries the run's cancel flag.
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check_cancelled(self) -> None:
+        """Cooperative check for thread-bound agents before expensive calls."""
+        if self._cancelled.is_set():
+            raise RunCancelled(f"run {self.run_id} cancelled")
+
+    def track(self, task: asyncio.Task) -> asyncio.Task:
+        """Register a background task to be cancelled together with the run."""
+        self._tasks.append(task)
+        return task
+
+    def cancel(self) -> None:
+        """Mark the run cancelled and cancel tracked tasks (call from the event loop)."""
+        self._cancelled.set()
+        for t in self._tasks:
+            if not t.done():
+                t.cancel()
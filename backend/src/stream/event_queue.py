@@ -0,0 +1,79 @@
+# stream/event_queue.py
+from __future__ import annotations
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from backend.src.stream.sse import coalesce_key
+
+
+class EventQueue:
+    """Bounded buffer between a run and its SSE writer.
+
+    Once `maxsize` events are queued, a new token event is merged into the queued
+    tail event when that is a token event of the same block. Events that cannot be
+    merged (block_start/block_end/run_end, ...) are still queued, never dropped, so
+    the queue may exceed `maxsize` by those. Puts never block the producer, which
+    keeps it safe to feed from worker threads via `call_soon_threadsafe`.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = max(1, int(maxsize))
+        self._items: Deque[Optional[Dict[str, Any]]] = deque()
+        self._merged: Dict[int, List[Any]] = {}
+        self._ready = asyncio.Event()
+        self.max_depth = 0
+        self.coalesced = 0
+        self.overflow = 0
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def put_nowait(self, ev: Optional[Dict[str, Any]]) -> None:
+        if ev is not None and len(self._items) >= self.maxsize:
+            if self._merge(ev):
+                self.coalesced += 1
+                return
+            self.overflow += 1
+        self._items.append(ev)
+        self.max_depth = max(self.max_depth, len(self._items))
+        self._ready.set()
+
+    async def put(self, ev: Optional[Dict[str, Any]]) -> None:
+        self.put_nowait(ev)
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        ev = self._items.popleft()
+        merged = self._merged.pop(id(ev), None) if ev is not None else None
+        if merged is not None:
+            # Queued dicts may be shared (replay buffer, other subscribers): build a new one.
+            parts, last = merged
+            ev = {**ev, "data": {**ev["data"], "text": "".join(parts)}}
+            if last is not None:
+                ev["id"] = last
+        return ev
+
+    def _merge(self, ev: Dict[str, Any]) -> bool:
+        # Only merge into the tail: merging past other events would reorder event ids
+        # and break Last-Event-ID resume.
+        key = coalesce_key(ev)
+        if key is None or not self._items or self._items[-1] is None:
+            return False
+        item = self._items[-1]
+        if coalesce_key(item) != key:
+            return False
+        merged = self._merged.setdefault(id(item), [[str(item["data"].get("text", ""))], None])
+        merged[0].append(str(ev["data"].get("text", "")))
+        merged[1] = ev.get("id")
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "depth": len(self._items),
+            "max_depth": self.max_depth,
+            "coalesced": self.coalesced,
+            "overflow": self.overflow,
+        }
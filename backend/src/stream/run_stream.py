@@ -0,0 +1,98 @@
+# stream/run_stream.py
+from __future__ import annotations
+import asyncio
+import itertools
+import os
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from backend.src.stream.event_queue import EventQueue
+
+
+_RUNS: Dict[str, "RunStream"] = {}
+
+
+class RunStream:
+    """Per-run event log: numbers events, keeps a replay ring buffer, fans out to subscribers.
+
+    All methods must be called on the event loop thread (producers in worker
+    threads go through `loop.call_soon_threadsafe(stream.publish, ev)`).
+    """
+
+    def __init__(self, run_id: str, buffer_size: int, queue_size: int, grace_secs: float):
+        self.run_id = run_id
+        self.finished = False
+        self.on_abandon: Optional[Callable[[], None]] = None
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=max(1, buffer_size))
+        self._next_id = 1
+        self._subs: List[EventQueue] = []
+        self._queue_size = queue_size
+        self._grace = grace_secs
+        self._abandon_timer: Optional[asyncio.TimerHandle] = None
+
+    def publish(self, ev: Dict[str, Any]) -> None:
+        if self.finished:
+            return
+        ev["id"] = self._next_id
+        self._next_id += 1
+        self._buffer.append(ev)
+        for q in self._subs:
+            q.put_nowait(ev)
+
+    def subscribe(self, after_id: int = 0) -> EventQueue:
+        """New subscriber queue, pre-filled with buffered events newer than `after_id`."""
+        q = EventQueue(maxsize=self._queue_size)
+        first = self._buffer[0]["id"] if self._buffer else self._next_id
+        for ev in itertools.islice(self._buffer, max(0, after_id - first + 1), None):
+            q.put_nowait(ev)
+        if self.finished:
+            q.put_nowait(None)
+        else:
+            self._subs.append(q)
+            if self._abandon_timer is not None:
+                self._abandon_timer.cancel()
+                self._abandon_timer = None
+        return q
+
+    def unsubscribe(self, q: EventQueue) -> None:
+        if q not in self._subs:
+            return
+        self._subs.remove(q)
+        if not self._subs and not self.finished and self._abandon_timer is None:
+            # Give the client a chance to re-attach with Last-Event-ID before giving up.
+            loop = asyncio.get_running_loop()
+            self._abandon_timer = loop.call_later(self._grace, self._abandon)
+
+    def close(self) -> None:
+        """Mark the run finished, end all live subscribers, keep the buffer for late re-attach."""
+        if self.finished:
+            return
+        self.finished = True
+        if self._abandon_timer is not None:
+            self._abandon_timer.cancel()
+            self._abandon_timer = None
+        for q in self._subs:
+            q.put_nowait(None)
+        self._subs.clear()
+        retain = float(os.getenv("SSE_RUN_RETAIN_SECS", "300"))
+        asyncio.get_running_loop().call_later(retain, _RUNS.pop, self.run_id, None)
+
+    def _abandon(self) -> None:
+        self._abandon_timer = None
+        if not self._subs and not self.finished and self.on_abandon:
+            self.on_abandon()
+
+
+def open_run(run_id: str) -> RunStream:
+    rs = RunStream(
+        run_id,
+        buffer_size=int(os.getenv("SSE_REPLAY_EVENTS", "4096")),
+        queue_size=int(os.getenv("SSE_QUEUE_MAX", "256")),
+        grace_secs=float(os.getenv("SSE_RESUME_GRACE_SECS", "15")),
+    )
+    _RUNS[run_id] = rs
+    return rs
+
+
+def get_run(run_id: str) -> Optional[RunStream]:
+    return _RUNS.get(run_id)
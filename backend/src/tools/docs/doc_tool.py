@@ -1,19 +1,36 @@
 # tools/docs/doc_tool.py
 from __future__ import annotations
-from typing import Any, Dict
+import io
+import os
 import re
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional
 
 from backend.src.schemas.results import ToolResult
-from backend.src.tools.media.assets import save_asset
-from backend.src.tools.rag.loaders import load_docs
+from backend.src.tools.media.assets import AssetWriter, save_asset
+from backend.src.tools.rag.loaders import SUPPORTED_EXTS, extract_text
 
 
-def doc_extract_text(path: str, max_chars: int = 12000) -> Dict[str, Any]:
-    docs = load_docs([path])
-    text = "\n\n".join(d.page_content for d in docs)[:max_chars]
+def doc_extract_text(
+    path: str,
+    max_chars: Optional[int] = None,
+    sha: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Leading text of a document within a character (or ~4 chars/token) budget.
+
+    Pages are parsed lazily until the budget is met and cached per attachment content.
+    """
+    budget = max_chars or int(os.getenv("DOC_EXTRACT_MAX_CHARS", "12000"))
+    if max_tokens:
+        budget = min(budget, max_tokens * 4)
+    fp = Path(path)
+    if not fp.exists() or fp.suffix.lower() not in SUPPORTED_EXTS:
+        return ToolResult(task_id="doc", kind="doc", ok=False, error=f"Unsupported or missing document: {fp.name}").model_dump()
+    text, pages, complete = extract_text(fp, budget, sha)
     return ToolResult(
         task_id="doc", kind="doc", ok=True,
-        data={"text": text, "pages": len(docs), "source": path},
+        data={"text": text, "pages": pages, "complete": complete, "source": path},
     ).model_dump()
 
 
@@ -74,7 +91,13 @@ def _escape_pdf_text(s: str) -> str:
     return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
 
 
-def _simple_pdf_bytes(content: str) -> bytes:
+# A4 portrait; text starts at y=800 with 14pt leading and a 50pt bottom margin.
+PDF_PAGE_SIZE = (612, 842)
+PDF_LINES_PER_PAGE = 54
+_PDF_FONTS = {"h1": b"/F2 16 Tf\n", "h2": b"/F2 14 Tf\n", "h3": b"/F2 12 Tf\n", "body": b"/F1 11 Tf\n"}
+
+
+def _pdf_lines(content: str) -> list[tuple[str, str]]:
     lines: list[tuple[str, str]] = []
     for row, style in _markdown_lines(content):
         r = row.encode("latin-1", "replace").decode("latin-1")
@@ -86,46 +109,68 @@ def _simple_pdf_bytes(content: str) -> bytes:
             lines.append((r[:width], style))
             r = r[width:]
         lines.append((r, style))
-    content = "BT\n/F1 11 Tf\n50 800 Td\n14 TL\n"
-    for ln, style in lines[:220]:
-        if style == "blank":
-            content += "T*\n"
-            continue
-        if style == "h1":
-            content += "/F2 16 Tf\n"
-        elif style == "h2":
-            content += "/F2 14 Tf\n"
-        elif style == "h3":
-            content += "/F2 12 Tf\n"
-        else:
-            content += "/F1 11 Tf\n"
-        content += f"({_escape_pdf_text(ln)}) Tj\nT*\n"
-    content += "ET\n"
-
-    stream = content.encode("latin-1", "replace")
-    objs = []
-    objs.append("1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n")
-    objs.append("2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n")
-    objs.append(
-        "3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
-        "/Contents 4 0 R /Resources << /Font << /F1 5 0 R /F2 6 0 R >> >> >>\nendobj\n"
-    )
-    objs.append(f"4 0 obj\n<< /Length {len(stream)} >>\nstream\n{stream.decode('latin-1')}endstream\nendobj\n")
-    objs.append("5 0 obj\n<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>\nendobj\n")
-    objs.append("6 0 obj\n<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>\nendobj\n")
-
-    pdf = "%PDF-1.4\n"
-    offsets = [0]
-    for obj in objs:
-        offsets.append(len(pdf.encode("latin-1")))
-        pdf += obj
-    xref_pos = len(pdf.encode("latin-1"))
-    pdf += f"xref\n0 {len(objs)+1}\n"
-    pdf += "0000000000 65535 f \n"
-    for off in offsets[1:]:
-        pdf += f"{off:010d} 00000 n \n"
-    pdf += f"trailer\n<< /Size {len(objs)+1} /Root 1 0 R >>\nstartxref\n{xref_pos}\n%%EOF\n"
-    return pdf.encode("latin-1", "replace")
+    return lines or [("", "blank")]
+
+
+def _page_stream(lines: list[tuple[str, str]]) -> bytes:
+    parts = [b"BT\n/F1 11 Tf\n50 800 Td\n14 TL\n"]
+    for ln, style in lines:
+        if style != "blank":
+            parts.append(_PDF_FONTS.get(style, _PDF_FONTS["body"]))
+            parts.append(b"(" + _escape_pdf_text(ln).encode("latin-1", "replace") + b") Tj\n")
+        parts.append(b"T*\n")
+    parts.append(b"ET\n")
+    return b"".join(parts)
+
+
+def write_pdf(out: BinaryIO, content: str) -> int:
+    """Write `content` (markdown) as a paginated PDF to `out`; returns bytes written.
+
+    Objects are emitted one page at a time and xref offsets are tracked as they are
+    written, so cost is linear in document size and only one page is held in memory.
+    """
+    lines = _pdf_lines(content)
+    pages = [lines[i : i + PDF_LINES_PER_PAGE] for i in range(0, len(lines), PDF_LINES_PER_PAGE)]
+    # 1 catalog, 2 page tree, 3-4 fonts, then a (page, contents) pair per page.
+    kids = " ".join(f"{5 + 2 * i} 0 R" for i in range(len(pages)))
+    offsets: list[int] = []
+    pos = 0
+
+    def put(data: bytes) -> None:
+        nonlocal pos
+        out.write(data)
+        pos += len(data)
+
+    def obj(body: bytes) -> None:
+        offsets.append(pos)
+        put(b"%d 0 obj\n" % len(offsets) + body + b"\nendobj\n")
+
+    put(b"%PDF-1.4\n")
+    obj(b"<< /Type /Catalog /Pages 2 0 R >>")
+    obj(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode("ascii"))
+    obj(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    obj(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>")
+    w, h = PDF_PAGE_SIZE
+    for page in pages:
+        n = len(offsets) + 1
+        obj(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {w} {h}] /Contents {n + 1} 0 R "
+            "/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>".encode("ascii")
+        )
+        stream = _page_stream(page)
+        obj(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"endstream")
+
+    xref_pos = pos
+    put(b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1))
+    put(b"".join(b"%010d 00000 n \n" % off for off in offsets))
+    put(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref_pos))
+    return pos
+
+
+def _simple_pdf_bytes(content: str) -> bytes:
+    buf = io.BytesIO()
+    write_pdf(buf, content)
+    return buf.getvalue()
 
 
 def _simple_doc_bytes(content: str) -> bytes:
@@ -149,15 +194,54 @@ def _simple_doc_bytes(content: str) -> bytes:
     return rtf.encode("utf-8")
 
 
+class DocStreamWriter:
+    """Markdown document written to its asset as the text is generated."""
+
+    def __init__(self, session_id: str):
+        self._w = AssetWriter(session_id, "md")
+        self._parts: list[str] = []
+
+    def write(self, tok: str) -> None:
+        if not self._parts:
+            tok = tok.lstrip()
+            if not tok:
+                return
+        self._parts.append(tok)
+        self._w.write(tok.encode("utf-8"))
+
+    def finish(self) -> Dict[str, Any]:
+        if not self._parts:
+            self.write("# Document\n\nNo content generated.")
+        self._w.close()
+        return ToolResult(
+            task_id="doc", kind="doc", ok=True,
+            data={"url": self._w.url, "filename": self._w.name, "mime": "text/markdown", "text": _as_plain_text("".join(self._parts))[:12000]},
+        ).model_dump()
+
+    def abort(self) -> None:
+        self._w.abort()
+
+
 def doc_generate_file(session_id: str, content: str, fmt: str = "txt") -> Dict[str, Any]:
     safe = (content or "").strip() or "# Document\n\nNo content generated."
     plain = _as_plain_text(safe)
     fmt = (fmt or "txt").lower()
     if fmt == "pdf":
-        ext = "pdf"
-        mime = "application/pdf"
-        blob = _simple_pdf_bytes(safe)
-    elif fmt == "doc":
+        # Written straight to the asset file rather than built in memory first.
+        w = AssetWriter(session_id, "pdf")
+        try:
+            write_pdf(w, safe)
+        except BaseException:
+            w.abort()
+            raise
+        w.close()
+        return ToolResult(
+            task_id="doc",
+            kind="doc",
+            ok=True,
+            data={"url": w.url, "filename": w.name, "mime": "application/pdf", "text": plain[:12000]},
+        ).model_dump()
+    if fmt == "doc":
         ext = "doc"
         mime = "application/msword"
         blob = _simple_doc_bytes(safe)
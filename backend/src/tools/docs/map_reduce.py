@@ -0,0 +1,99 @@
+# tools/docs/map_reduce.py
+from __future__ import annotations
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from backend.src.llm.factory import get_llm
+from backend.src.tools.media.artifact_cache import cache_get_bytes, cache_key, cache_put_bytes
+from backend.src.tools.rag.loaders import extract_text
+
+
+MAP_PROMPT = (
+    "Summarize this section of a longer document.\n"
+    "Keep every concrete fact, figure, name, date, definition and conclusion; drop filler.\n"
+    "Use short markdown bullets. Do not add information that is not in the section.\n\n"
+    "SECTION:\n{text}\n"
+)
+REDUCE_PROMPT = (
+    "Combine these consecutive partial summaries of one document into a single summary.\n"
+    "Keep concrete facts, figures and names; merge duplicates; keep the document's order.\n"
+    "Use short markdown bullets.\n\n{text}\n"
+)
+
+
+def split_sections(text: str, size: int) -> List[str]:
+    """Pack paragraphs into sections of at most `size` chars (long paragraphs are cut)."""
+    sections: List[str] = []
+    cur: List[str] = []
+    used = 0
+    for para in text.split("\n\n"):
+        para = para.strip()
+        while len(para) > size:
+            sections.append(para[:size])
+            para = para[size:]
+        if not para:
+            continue
+        if cur and used + len(para) + 2 > size:
+            sections.append("\n\n".join(cur))
+            cur, used = [], 0
+        cur.append(para)
+        used += len(para) + 2
+    if cur:
+        sections.append("\n\n".join(cur))
+    return sections
+
+
+def _complete(provider: str, model: str, prompt: str) -> str:
+    # Results depend only on the prompt, so identical sections (this or any other
+    # upload, any question) are summarized once.
+    key = cache_key("doc_map", provider=provider, model=model, prompt=prompt)
+    hit = cache_get_bytes(key)
+    if hit is not None:
+        return hit.decode("utf-8")
+    llm = get_llm(provider, model, streaming=False, temperature=0.2)
+    out = (getattr(llm.invoke(prompt), "content", "") or "").strip()
+    if out:
+        cache_put_bytes(key, out.encode("utf-8"), "md")
+    return out
+
+
+def section_summaries(
+    path: str,
+    provider: str,
+    model: str,
+    sha: Optional[str] = None,
+    check: Optional[Callable[[], None]] = None,
+) -> Tuple[List[str], int]:
+    """Map-reduce a whole document: (partial summaries in order, number of sections).
+
+    Sections of DOC_SECTION_CHARS are summarized in parallel (DOC_MAP_CONCURRENCY),
+    then combined DOC_REDUCE_FANIN at a time until they fit DOC_REDUCE_MAX_CHARS.
+    Every call is cached by its prompt, so repeat questions only pay for the answer.
+    """
+    size = int(os.getenv("DOC_SECTION_CHARS", "12000"))
+    fan_in = max(2, int(os.getenv("DOC_REDUCE_FANIN", "6")))
+    budget = int(os.getenv("DOC_REDUCE_MAX_CHARS", "12000"))
+    text, _, _ = extract_text(Path(path), int(os.getenv("DOC_MAP_MAX_CHARS", "2000000")), sha)
+    sections = split_sections(text, size)
+    if not sections:
+        return [], 0
+
+    def call(prompt: str) -> str:
+        if check is not None:
+            check()
+        return _complete(provider, model, prompt)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, int(os.getenv("DOC_MAP_CONCURRENCY", "8"))))
+    try:
+        parts = list(pool.map(call, [MAP_PROMPT.format(text=s) for s in sections]))
+        parts = [p for p in parts if p]
+        while len(parts) > 1 and sum(len(p) for p in parts) > budget:
+            groups = [parts[i : i + fan_in] for i in range(0, len(parts), fan_in)]
+            prompts = [REDUCE_PROMPT.format(text="\n\n---\n\n".join(g)) if len(g) > 1 else "" for g in groups]
+            merged = pool.map(lambda pg: call(pg[0]) if pg[0] else pg[1][0], zip(prompts, groups))
+            parts = [p for p in merged if p]
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return parts, len(sections)
@@ -0,0 +1,173 @@
+# tools/media/artifact_cache.py
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from backend.src.core.jsonx import read_json_file, write_json_file
+from backend.src.tools.media.assets import BASE, link_asset
+
+
+# Generated images/audio/documents keyed by a hash of the normalized request.
+CACHE_DIR = Path("backend/data/artifact-cache")
+
+_REGENERATE_RE = re.compile(
+    r"\b(regenerate|re-?generate|redo|re-?do|try again|another (one|version|take|variation)|new version|"
+    r"different (one|version|image|voice)|fresh (one|version|take|copy))\b",
+    re.IGNORECASE,
+)
+_evict_lock = threading.Lock()
+# Bytes on disk, counted once by a directory scan and then kept up to date by puts.
+# Entries written by other processes are picked up at the next scan, which runs only
+# when this count crosses the limit.
+_SIZE: Dict[str, Optional[int]] = {"total": None}
+
+
+def enabled() -> bool:
+    return os.getenv("ARTIFACT_CACHE", "1") != "0"
+
+
+def wants_fresh(user_text: str) -> bool:
+    """True when the user explicitly asks for a new result instead of a cached one."""
+    return bool(_REGENERATE_RE.search(user_text or ""))
+
+
+def cache_key(kind: str, **params: Any) -> str:
+    norm = {k: (" ".join(v.split()) if isinstance(v, str) else v) for k, v in params.items()}
+    raw = json.dumps({"kind": kind, **norm}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _entry(key: str) -> Tuple[Path, Path]:
+    d = CACHE_DIR / key[:2]
+    return d / f"{key}.json", d / key
+
+
+def cache_get(session_id: str, key: str) -> Optional[Dict[str, Any]]:
+    """On a hit, expose the cached file as a new asset of `session_id`; returns url/filename/meta."""
+    if not enabled():
+        return None
+    meta_path, blob = _entry(key)
+    meta = read_json_file(meta_path)
+    if not isinstance(meta, dict) or not blob.exists():
+        return None
+    try:
+        name, url = link_asset(session_id, blob, str(meta.get("ext") or "bin"))
+        now = time.time()
+        os.utime(meta_path, (now, now))  # LRU recency
+    except OSError:
+        return None
+    return {"url": url, "filename": name, "meta": meta.get("meta") or {}}
+
+
+def cache_put(key: str, session_id: str, filename: str, meta: Dict[str, Any]) -> None:
+    """Remember a freshly generated asset (best-effort) and keep the cache within its size bound."""
+    if not enabled():
+        return
+    src = BASE / session_id / filename
+    meta_path, blob = _entry(key)
+    before = _entry_size(meta_path, blob)
+    try:
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_name(f"{blob.name}.{os.getpid()}.tmp")
+        tmp.unlink(missing_ok=True)
+        try:
+            os.link(src, tmp)
+        except OSError:
+            tmp.write_bytes(src.read_bytes())
+        os.replace(tmp, blob)
+        gz = src.with_name(src.name + ".gz")
+        if gz.exists():
+            blob_gz = blob.with_name(blob.name + ".gz")
+            blob_gz.unlink(missing_ok=True)
+            os.link(gz, blob_gz)
+        write_json_file(meta_path, {"ext": src.suffix.lstrip("."), "meta": meta, "created": time.time()})
+    except OSError:
+        return
+    _account(meta_path, blob, before)
+
+
+def cache_get_bytes(key: str) -> Optional[bytes]:
+    """Raw cached content (e.g. one synthesized TTS chunk), or None."""
+    if not enabled():
+        return None
+    meta_path, blob = _entry(key)
+    try:
+        data = blob.read_bytes()
+        now = time.time()
+        os.utime(meta_path, (now, now))
+    except OSError:
+        return None
+    return data
+
+
+def cache_put_bytes(key: str, data: bytes, ext: str) -> None:
+    if not enabled():
+        return
+    meta_path, blob = _entry(key)
+    before = _entry_size(meta_path, blob)
+    try:
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_name(f"{blob.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, blob)
+        write_json_file(meta_path, {"ext": ext.lstrip("."), "meta": {}, "created": time.time()})
+    except OSError:
+        return
+    _account(meta_path, blob, before)
+
+
+def _entry_size(meta_path: Path, blob: Path) -> int:
+    size = 0
+    for p in (meta_path, blob, blob.with_name(blob.name + ".gz")):
+        try:
+            size += p.stat().st_size
+        except OSError:
+            pass
+    return size
+
+
+def _limit() -> int:
+    return int(float(os.getenv("ARTIFACT_CACHE_MB", "1024")) * 1024 * 1024)
+
+
+def _account(meta_path: Path, blob: Path, before: int) -> None:
+    """Count one written entry (`before` = its size prior to the write); evict past the limit."""
+    with _evict_lock:
+        if _SIZE["total"] is not None:
+            _SIZE["total"] += _entry_size(meta_path, blob) - before
+            if _SIZE["total"] <= _limit():
+                return
+        _evict()
+
+
+def _evict() -> None:
+    # Caller holds _evict_lock. Least recently used first; recency is the metadata
+    # file's mtime (touched on hits). Evicts down to 90% so the next few puts do not
+    # rescan the directory again.
+    limit = _limit()
+    entries = []
+    total = 0
+    for meta_path in CACHE_DIR.glob("*/*.json"):
+        blob = meta_path.with_suffix("")
+        try:
+            mtime = meta_path.stat().st_mtime
+        except OSError:
+            continue
+        size = _entry_size(meta_path, blob)
+        entries.append((mtime, size, meta_path, blob))
+        total += size
+    if total > limit:
+        entries.sort()
+        for _, size, meta_path, blob in entries:
+            if total <= limit * 0.9:
+                break
+            for p in (meta_path, blob, blob.with_name(blob.name + ".gz")):
+                p.unlink(missing_ok=True)
+            total -= size
+    _SIZE["total"] = total
@@ -1,16 +1,85 @@
 # tools/media/assets.py
 from __future__ import annotations
+import gzip
+import os
 from pathlib import Path
 from typing import Tuple
 from uuid import uuid4
 
 
 BASE = Path("backend/data/uploads")
+# Text formats worth serving gzip-encoded; binary media is already compressed.
+PRECOMPRESS_EXTS = {"md", "txt", "html", "csv", "json", "svg"}
+PRECOMPRESS_MIN_BYTES = 1024
+# Marker present while an asset is still being written (see AssetWriter).
+PARTIAL_SUFFIX = ".partial"
 
 
 def save_asset(session_id: str, ext: str, data: bytes) -> Tuple[str, str]:
     d = BASE / session_id
     d.mkdir(parents=True, exist_ok=True)
-    name = f"{str(uuid4())[:8]}.{ext.lstrip('.')}"
+    ext = ext.lstrip(".")
+    name = f"{str(uuid4())[:8]}.{ext}"
     (d / name).write_bytes(data)
+    _precompress(d / name, data)
+    return name, f"/api/assets/{session_id}/{name}"
+
+
+def _precompress(path: Path, data: bytes) -> None:
+    if path.suffix.lstrip(".").lower() in PRECOMPRESS_EXTS and len(data) >= PRECOMPRESS_MIN_BYTES and os.getenv("ASSET_PRECOMPRESS", "1") != "0":
+        packed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(packed) < len(data):
+            path.with_name(path.name + ".gz").write_bytes(packed)
+
+
+def link_asset(session_id: str, src: Path, ext: str) -> Tuple[str, str]:
+    """Expose an existing file (and its .gz sidecar) as a new asset without copying bytes."""
+    d = BASE / session_id
+    d.mkdir(parents=True, exist_ok=True)
+    name = f"{str(uuid4())[:8]}.{ext.lstrip('.')}"
+    for s, dst in ((src, d / name), (src.with_name(src.name + ".gz"), d / f"{name}.gz")):
+        if not s.exists():
+            continue
+        try:
+            os.link(s, dst)
+        except OSError:
+            dst.write_bytes(s.read_bytes())
     return name, f"/api/assets/{session_id}/{name}"
+
+
+def partial_marker(path: Path) -> Path:
+    return path.with_name(path.name + PARTIAL_SUFFIX)
+
+
+class AssetWriter:
+    """Asset written chunk by chunk; its URL can be served while it grows.
+
+    The marker file is created before the first byte and removed once the asset is
+    complete (or deleted on failure), so any process serving the URL can tell.
+    """
+
+    def __init__(self, session_id: str, ext: str):
+        d = BASE / session_id
+        d.mkdir(parents=True, exist_ok=True)
+        self.name = f"{str(uuid4())[:8]}.{ext.lstrip('.')}"
+        self.path = d / self.name
+        self.url = f"/api/assets/{session_id}/{self.name}"
+        self.size = 0
+        partial_marker(self.path).touch()
+        self._f = self.path.open("wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._f.write(chunk)
+        self._f.flush()
+        self.size += len(chunk)
+
+    def close(self) -> None:
+        self._f.close()
+        if self.path.suffix.lstrip(".").lower() in PRECOMPRESS_EXTS:
+            _precompress(self.path, self.path.read_bytes())
+        partial_marker(self.path).unlink(missing_ok=True)
+
+    def abort(self) -> None:
+        self._f.close()
+        self.path.unlink(missing_ok=True)
+        partial_marker(self.path).unlink(missing_ok=True)
@@ -0,0 +1,75 @@
+# tools/media/blobs.py
+from __future__ import annotations
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Tuple
+from uuid import uuid4
+
+
+# Uploads are stored once by content hash; session upload paths are hardlinks to them.
+BLOBS_DIR = Path("backend/data/blobs")
+# Artifacts computed from a blob (extracted text, chunks, vector shards), keyed by its hash.
+DERIVED_DIR = Path("backend/data/derived")
+
+_SHA_MEMO: Dict[Tuple[str, int, int], str] = {}
+_SHA_MEMO_MAX = 4096
+
+
+def blob_path(sha: str, ext: str) -> Path:
+    return BLOBS_DIR / sha[:2] / f"{sha}{ext.lower()}"
+
+
+def derived_dir(sha: str) -> Path:
+    return DERIVED_DIR / sha[:2] / sha
+
+
+def _remember(path: Path, sha: str) -> None:
+    st = path.stat()
+    if len(_SHA_MEMO) >= _SHA_MEMO_MAX:
+        _SHA_MEMO.clear()
+    _SHA_MEMO[(str(path), st.st_mtime_ns, st.st_size)] = sha
+
+
+def file_sha256(path: str | Path) -> str:
+    """Content hash of a file, memoized per (path, mtime, size)."""
+    p = Path(path)
+    st = p.stat()
+    key = (str(p), st.st_mtime_ns, st.st_size)
+    sha = _SHA_MEMO.get(key)
+    if sha is None:
+        h = hashlib.sha256()
+        with p.open("rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        sha = h.hexdigest()
+        _remember(p, sha)
+    return sha
+
+
+def link_blob(tmp: Path, sha: str, dest: Path) -> bool:
+    """Move a hashed temp file into the blob store and expose it at `dest`.
+
+    Returns True when the content was already stored. Falls back to a copy when
+    hardlinks are unavailable (other filesystem, no permission).
+    """
+    blob = blob_path(sha, dest.suffix)
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    existed = blob.exists()
+    if existed:
+        tmp.unlink(missing_ok=True)
+    else:
+        os.replace(tmp, blob)
+    try:
+        os.link(blob, dest)
+    except OSError:
+        shutil.copyfile(blob, dest)
+    _remember(dest, sha)
+    return existed
+
+
+def new_tmp_path() -> Path:
+    d = BLOBS_DIR / "tmp"
+    d.mkdir(parents=True, exist_ok=True)
+    return d / f"{uuid4().hex}.part"
@@ -4,20 +4,28 @@ import base64
 import os
 from typing import Any, Dict
 
-from openai import OpenAI
-
+from backend.src.core.http import openai_client
 from backend.src.schemas.results import ToolResult
+from backend.src.tools.media.artifact_cache import cache_get, cache_key, cache_put
 from backend.src.tools.media.assets import save_asset
 
 
-def image_generate(session_id: str, prompt: str, size: str = "1024x1024") -> Dict[str, Any]:
+def image_generate(session_id: str, prompt: str, size: str = "1024x1024", fresh: bool = False) -> Dict[str, Any]:
+    model = os.getenv("IMAGE_MODEL", "gpt-image-1")
+    key = cache_key("image_gen", model=model, prompt=prompt, size=size)
+    hit = None if fresh else cache_get(session_id, key)
+    if hit:
+        return ToolResult(
+            task_id="image_gen", kind="image_gen", ok=True,
+            data={"url": hit["url"], "filename": hit["filename"], "mime": "image/png", "size": size, "model": model, "prompt": prompt, "cached": True},
+        ).model_dump()
     if not os.getenv("OPENAI_API_KEY"):
         raise RuntimeError("Missing env var: OPENAI_API_KEY")
-    model = os.getenv("IMAGE_MODEL", "gpt-image-1")
-    client = OpenAI()
+    client = openai_client()
     r = client.images.generate(model=model, prompt=prompt, size=size)
     b64 = r.data[0].b64_json
     name, url = save_asset(session_id, "png", base64.b64decode(b64))
+    cache_put(key, session_id, name, {})
     return ToolResult(
         task_id="image_gen", kind="image_gen", ok=True,
         data={"url": url, "filename": name, "mime": "image/png", "size": size, "model": model, "prompt": prompt},
@@ -1,22 +1,152 @@
 # tools/media/tts_tool.py
 from __future__ import annotations
 import os
-from typing import Any, Dict
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 
 from openai import OpenAI
 
+from backend.src.core.http import openai_client
 from backend.src.schemas.results import ToolResult
-from backend.src.tools.media.assets import save_asset
+from backend.src.tools.media.artifact_cache import cache_get, cache_get_bytes, cache_key, cache_put, cache_put_bytes
+from backend.src.tools.media.assets import AssetWriter
 
 
-def tts_generate(session_id: str, text: str, voice: str = "alloy") -> Dict[str, Any]:
+TTS_CHUNK_BYTES = 16 * 1024
+# First piece is kept short so playback starts after one quick synthesis.
+FIRST_CHUNK_CHARS = 300
+
+
+def split_text(text: str, max_chars: int, first_chars: int = FIRST_CHUNK_CHARS) -> List[str]:
+    """Split at paragraph, then sentence, then word boundaries into pieces <= max_chars."""
+    units: List[str] = []
+    for para in re.split(r"\n\s*\n", text.strip()):
+        for sent in re.split(r"(?<=[.!?;:])\s+", para.strip()):
+            while len(sent) > max_chars:
+                cut = sent.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                units.append(sent[:cut])
+                sent = sent[cut:].strip()
+            if sent:
+                units.append(sent)
+        if units:
+            units[-1] += "\n\n"
+    chunks: List[str] = []
+    cur = ""
+    for u in units:
+        limit = first_chars if not chunks else max_chars
+        if cur and len(cur) + 1 + len(u) > limit:
+            chunks.append(cur.strip())
+            cur = ""
+        cur = f"{cur} {u}" if cur and not cur.endswith("\n") else cur + u
+    if cur.strip():
+        chunks.append(cur.strip())
+    return chunks
+
+
+_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],  # MPEG-1 layer III
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],  # MPEG-2/2.5 layer III
+}
+_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def _frame_len(h: bytes) -> int:
+    """Length of the layer III frame whose 4-byte header is `h`, or 0 if not a frame header."""
+    if len(h) < 4 or h[0] != 0xFF or (h[1] & 0xE0) != 0xE0:
+        return 0
+    version, layer = (h[1] >> 3) & 3, (h[1] >> 1) & 3
+    br_idx, sr_idx, pad = h[2] >> 4, (h[2] >> 2) & 3, (h[2] >> 1) & 1
+    if version == 1 or layer != 1 or br_idx in (0, 15) or sr_idx == 3:
+        return 0
+    bitrate = _BITRATES[1 if version == 3 else 2][br_idx] * 1000
+    rate = _SAMPLE_RATES[version][sr_idx]
+    return (144 if version == 3 else 72) * bitrate // rate + pad
+
+
+def mp3_frames(data: bytes) -> bytes:
+    """Audio frames only: drop ID3v2/ID3v1 tags and a leading Xing/Info header frame.
+
+    Concatenating the results of several encodes then plays as one stream, without a
+    per-piece tag or a header frame that claims the first piece's duration.
+    """
+    start = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        start = 10 + ((data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F))
+    end = len(data) - 128 if len(data) >= 128 and data[-128:-125] == b"TAG" else len(data)
+    while start < end - 4 and not _frame_len(data[start : start + 4]):
+        start += 1
+    n = _frame_len(data[start : start + 4])
+    if n and (b"Xing" in data[start : start + 48] or b"Info" in data[start : start + 48]):
+        start += n
+    return data[start:end]
+
+
+def _synthesize(client: OpenAI, model: str, voice: str, text: str, fresh: bool = False) -> bytes:
+    key = cache_key("tts_chunk", model=model, voice=voice, text=text)
+    # A regenerate request re-synthesizes every chunk; the new take replaces the cached one.
+    data = None if fresh else cache_get_bytes(key)
+    if data is None:
+        data = client.audio.speech.create(model=model, voice=voice, input=text, response_format="mp3").read()
+        cache_put_bytes(key, data, "mp3")
+    return data
+
+
+def tts_generate(
+    session_id: str,
+    text: str,
+    voice: str = "alloy",
+    fresh: bool = False,
+    on_first_chunk: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Synthesize speech, writing MP3 chunks to the asset as they arrive.
+
+    `on_first_chunk` receives the asset data (url, filename, mime) once playback can
+    start; the URL serves the growing file until synthesis completes. Texts longer
+    than TTS_SPLIT_CHARS are synthesized as parallel pieces (TTS_CONCURRENCY) and
+    appended in order.
+    """
+    model = os.getenv("TTS_MODEL", "gpt-4o-mini-tts")
+    key = cache_key("tts", model=model, voice=voice, text=text)
+    hit = None if fresh else cache_get(session_id, key)
+    if hit:
+        return ToolResult(
+            task_id="tts", kind="tts", ok=True,
+            data={"url": hit["url"], "filename": hit["filename"], "mime": "audio/mpeg", "voice": voice, "model": model, "cached": True},
+        ).model_dump()
     if not os.getenv("OPENAI_API_KEY"):
         raise RuntimeError("Missing env var: OPENAI_API_KEY")
-    model = os.getenv("TTS_MODEL", "gpt-4o-mini-tts")
-    client = OpenAI()
-    audio = client.audio.speech.create(model=model, voice=voice, input=text)
-    name, url = save_asset(session_id, "mp3", audio.read())
-    return ToolResult(
-        task_id="tts", kind="tts", ok=True,
-        data={"url": url, "filename": name, "mime": "audio/mpeg", "voice": voice, "model": model},
-    ).model_dump()
+    client = openai_client()
+    w = AssetWriter(session_id, "mp3")
+    data = {"url": w.url, "filename": w.name, "mime": "audio/mpeg", "voice": voice, "model": model}
+
+    def write(chunk: bytes) -> None:
+        w.write(chunk)
+        if on_first_chunk is not None and w.size == len(chunk):
+            on_first_chunk({**data, "streaming": True})
+
+    long_text = len(text) > int(os.getenv("TTS_SPLIT_CHARS", "1200"))
+    pieces = split_text(text, int(os.getenv("TTS_CHUNK_CHARS", "800"))) if long_text else [text]
+    try:
+        if len(pieces) > 1:
+            pool = ThreadPoolExecutor(max_workers=max(1, int(os.getenv("TTS_CONCURRENCY", "4"))))
+            try:
+                # map() yields in input order, so audio is appended deterministically
+                # while later pieces are still being synthesized.
+                for audio in pool.map(lambda p: _synthesize(client, model, voice, p, fresh), pieces):
+                    write(mp3_frames(audio))
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+        else:
+            with client.audio.speech.with_streaming_response.create(
+                model=model, voice=voice, input=text, response_format="mp3"
+            ) as audio:
+                for chunk in audio.iter_bytes(TTS_CHUNK_BYTES):
+                    write(chunk)
+    except BaseException:
+        w.abort()
+        raise
+    w.close()
+    cache_put(key, session_id, w.name, {})
+    return ToolResult(task_id="tts", kind="tts", ok=True, data=data).model_dump()
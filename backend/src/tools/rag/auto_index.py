@@ -3,27 +3,30 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Dict, List
 
-from backend.src.tools.rag.loaders import load_docs
-from backend.src.tools.rag.indexer import build_session_index
+from backend.src.tools.media.blobs import file_sha256
+from backend.src.tools.rag.indexer import build_session_index_from_files, read_manifest
 
 
 def ensure_index(session_id: str, attachments: List[Dict[str, Any]]) -> None:
-    idx = Path("backend/data/sessions") / session_id / "rag"
-    if idx.exists():
-        return
+    """(Re)build the session index when its set of documents changed.
+
+    Unchanged sets are a manifest comparison; changed sets merge cached per-document
+    shards, so only never-seen content is embedded.
+    """
     allowed_ext = {".pdf", ".txt", ".md", ".docx"}
-    paths = []
+    files = []
     for a in attachments:
         p = a.get("path")
         if not p:
             continue
         if str(a.get("kind", "")).lower() != "doc":
             continue
-        if Path(str(p)).suffix.lower() not in allowed_ext:
+        if Path(str(p)).suffix.lower() not in allowed_ext or not Path(str(p)).exists():
             continue
-        paths.append(p)
-    if not paths:
+        files.append((str(p), str(a.get("name") or Path(str(p)).name), a.get("sha256") or file_sha256(p)))
+    if not files:
+        return
+    idx = Path("backend/data/sessions") / session_id / "rag"
+    if (idx / "index.faiss").exists() and set(read_manifest(session_id).get("sources", {})) == {f[2] for f in files}:
         return
-    docs = load_docs(paths)
-    if docs:
-        build_session_index(session_id, docs)
+    build_session_index_from_files(session_id, files)
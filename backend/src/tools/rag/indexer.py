@@ -1,22 +1,41 @@
 # tools/rag/indexer.py
 from __future__ import annotations
+import json
 import os
+import shutil
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
 
 from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
 from langchain_openai import OpenAIEmbeddings
 
+from backend.src.core.jsonx import read_json_file, write_json_file
+from backend.src.tools.media.blobs import derived_dir
 from backend.src.tools.rag.chunker import chunk_docs
+from backend.src.tools.rag.loaders import load_file
 from backend.src.schemas.results import ToolResult
 
 
+MANIFEST = "sources.json"
+
+
 def _rag_dir(session_id: str) -> Path:
     p = Path("backend/data/sessions") / session_id / "rag"
     p.mkdir(parents=True, exist_ok=True)
     return p
 
 
+def _swap_dir(tmp: Path, dest: Path) -> None:
+    """Atomically-ish replace `dest` with the fully written `tmp` directory."""
+    old = dest.with_name(f"{dest.name}.{uuid4().hex[:8]}.old")
+    if dest.exists():
+        os.replace(dest, old)
+    os.replace(tmp, dest)
+    shutil.rmtree(old, ignore_errors=True)
+
+
 def build_session_index(session_id: str, docs: List, embedding_model: str = "text-embedding-3-small") -> Dict[str, Any]:
     if not os.getenv("OPENAI_API_KEY"):
         raise RuntimeError("Missing env var: OPENAI_API_KEY (embeddings)")
@@ -28,3 +47,79 @@ def build_session_index(session_id: str, docs: List, embedding_model: str = "tex
         task_id="rag_index", kind="rag", ok=True,
         data={"session_id": session_id, "docs": len(docs), "chunks": len(chunks)}
     ).model_dump()
+
+
+def _chunks(fp: Path, sha: str) -> List[Document]:
+    cache = derived_dir(sha) / "chunks-900-150.json"
+    rows = read_json_file(cache)
+    if rows is not None:
+        return [Document(page_content=r["text"], metadata=dict(r["meta"])) for r in rows]
+    chunks = chunk_docs(load_file(fp, sha))
+    for c in chunks:
+        # Shared by every session holding this content: no session-specific path.
+        c.metadata["source"] = ""
+    write_json_file(cache, [{"text": c.page_content, "meta": c.metadata} for c in chunks])
+    return chunks
+
+
+def _shard(fp: Path, sha: str, emb: OpenAIEmbeddings, embedding_model: str) -> Optional[FAISS]:
+    """Vector index of one document, embedded once per content hash and model."""
+    d = derived_dir(sha) / f"faiss-{embedding_model}"
+    if (d / "index.faiss").exists():
+        return FAISS.load_local(str(d), emb, allow_dangerous_deserialization=True)
+    chunks = _chunks(fp, sha)
+    if not chunks:
+        return None
+    vs = FAISS.from_documents(chunks, emb)
+    tmp = d.with_name(f"{d.name}.{uuid4().hex[:8]}.tmp")
+    vs.save_local(str(tmp))
+    try:
+        os.replace(tmp, d)
+    except OSError:
+        # Another worker stored the same shard first.
+        shutil.rmtree(tmp, ignore_errors=True)
+    return vs
+
+
+def build_session_index_from_files(
+    session_id: str,
+    files: List[Tuple[str, str, str]],
+    embedding_model: str = "text-embedding-3-small",
+) -> Dict[str, Any]:
+    """Session index as a merge of per-document shards; `files` is (path, name, sha256).
+
+    Only documents never embedded before (by any session) call the embeddings API.
+    """
+    if not os.getenv("OPENAI_API_KEY"):
+        raise RuntimeError("Missing env var: OPENAI_API_KEY (embeddings)")
+    emb = OpenAIEmbeddings(model=embedding_model)
+    sources: Dict[str, Dict[str, str]] = {}
+    merged: Optional[FAISS] = None
+    for path, name, sha in files:
+        if sha in sources:
+            continue
+        sources[sha] = {"path": path, "name": name}
+        shard = _shard(Path(path), sha, emb, embedding_model)
+        if shard is None:
+            continue
+        if merged is None:
+            merged = shard
+        else:
+            merged.merge_from(shard)
+    if merged is None:
+        return ToolResult(task_id="rag_index", kind="rag", ok=False, error="No indexable documents").model_dump()
+
+    dest = _rag_dir(session_id)
+    tmp = dest.with_name(f"{dest.name}.{uuid4().hex[:8]}.tmp")
+    merged.save_local(str(tmp))
+    (tmp / MANIFEST).write_text(json.dumps({"embedding_model": embedding_model, "sources": sources}), encoding="utf-8")
+    _swap_dir(tmp, dest)
+    return ToolResult(
+        task_id="rag_index", kind="rag", ok=True,
+        data={"session_id": session_id, "docs": len(sources), "chunks": merged.index.ntotal}
+    ).model_dump()
+
+
+def read_manifest(session_id: str) -> Dict[str, Any]:
+    m = read_json_file(Path("backend/data/sessions") / session_id / "rag" / MANIFEST)
+    return m if isinstance(m, dict) else {}
@@ -1,34 +1,118 @@
 # tools/rag/loaders.py
 from __future__ import annotations
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from langchain_core.documents import Document
 from langchain_community.document_loaders import PyPDFLoader, TextLoader, Docx2txtLoader
 
+from backend.src.core.jsonx import read_json_file, write_json_file
+from backend.src.tools.media.blobs import derived_dir, file_sha256
+
+
+SUPPORTED_EXTS = {".pdf", ".txt", ".md", ".docx"}
+
+# sha -> (page texts extracted so far, whole document reached)
+_EXTRACT_MEMO: Dict[str, Tuple[List[str], bool]] = {}
+_EXTRACT_MEMO_MAX = 64
+
+
+def _parse(fp: Path) -> List[Document]:
+    ext = fp.suffix.lower()
+    if ext == ".pdf":
+        return PyPDFLoader(str(fp)).load()
+    if ext in (".txt", ".md"):
+        return TextLoader(str(fp), encoding="utf-8").load()
+    if ext == ".docx":
+        return Docx2txtLoader(str(fp)).load()
+    return []
+
+
+def load_file(fp: Path, sha: Optional[str] = None) -> List[Document]:
+    """Extract one file, reusing text already extracted from identical content."""
+    sha = sha or file_sha256(fp)
+    cache = derived_dir(sha) / "docs.json"
+    rows = read_json_file(cache)
+    if rows is None:
+        docs = _parse(fp)
+        write_json_file(cache, [{"text": d.page_content, "meta": {k: v for k, v in d.metadata.items() if k != "source"}} for d in docs])
+    else:
+        docs = [Document(page_content=r["text"], metadata=dict(r["meta"])) for r in rows]
+    for d in docs:
+        # Cached text may come from another session's upload: always cite this path.
+        d.metadata["source"] = str(fp)
+        d.metadata["sha256"] = sha
+    return docs
+
+
+def _iter_pages(fp: Path, start: int) -> Iterator[str]:
+    """Page texts from index `start` on, parsed one page at a time where the format allows."""
+    if fp.suffix.lower() == ".pdf":
+        from pypdf import PdfReader
+
+        reader = PdfReader(str(fp))
+        for i in range(start, len(reader.pages)):
+            yield reader.pages[i].extract_text() or ""
+        return
+    for d in _parse(fp)[start:]:
+        yield d.page_content
+
+
+def extract_text(fp: Path, max_chars: int, sha: Optional[str] = None) -> Tuple[str, int, bool]:
+    """Text of the leading pages up to `max_chars`: (text, pages read, whole document read).
+
+    Stops parsing once the budget is met. Pages read so far are cached per content
+    hash, so a repeat or larger request resumes where the last one stopped; a full
+    extraction from load_file (docs.json) is reused as is.
+    """
+    sha = sha or file_sha256(fp)
+    hit = _EXTRACT_MEMO.get(sha)
+    if hit is None:
+        full = read_json_file(derived_dir(sha) / "docs.json")
+        row = read_json_file(derived_dir(sha) / "extract.json")
+        if isinstance(full, list):
+            hit = ([str(r.get("text", "")) for r in full], True)
+        elif isinstance(row, dict):
+            hit = (list(row.get("pages") or []), bool(row.get("done")))
+        else:
+            hit = ([], False)
+    pages, done = hit
+    used = sum(len(p) for p in pages) + 2 * max(0, len(pages) - 1)
+    if not done and used < max_chars:
+        pages = list(pages)
+        done = True
+        for text in _iter_pages(fp, len(pages)):
+            pages.append(text)
+            used += len(text) + 2
+            if used >= max_chars:
+                done = False
+                break
+        write_json_file(derived_dir(sha) / "extract.json", {"pages": pages, "done": done})
+    if len(_EXTRACT_MEMO) >= _EXTRACT_MEMO_MAX:
+        _EXTRACT_MEMO.pop(next(iter(_EXTRACT_MEMO)))
+    _EXTRACT_MEMO[sha] = (pages, done)
+    # Only the pages needed for this budget are reported as read.
+    out: List[str] = []
+    total = 0
+    for text in pages:
+        if total >= max_chars:
+            break
+        out.append(text)
+        total += len(text) + 2
+    return "\n\n".join(out)[:max_chars], len(out), done and len(out) == len(pages)
+
 
 def load_docs(paths: List[str]) -> List[Document]:
     docs: List[Document] = []
-    supported = {".pdf", ".txt", ".md", ".docx"}
     for p in paths:
         fp = Path(p)
         if not fp.exists():
             continue
-        ext = fp.suffix.lower()
-        if ext not in supported:
+        if fp.suffix.lower() not in SUPPORTED_EXTS:
             continue
-        before = len(docs)
         try:
-            if ext == ".pdf":
-                docs += PyPDFLoader(str(fp)).load()
-            elif ext in (".txt", ".md"):
-                docs += TextLoader(str(fp), encoding="utf-8").load()
-            elif ext == ".docx":
-                docs += Docx2txtLoader(str(fp)).load()
+            docs += load_file(fp)
         except Exception:
             # Skip unreadable/unsupported documents instead of failing the full run.
             continue
-
-        for d in docs[before:]:
-            d.metadata.setdefault("source", str(fp))
     return docs
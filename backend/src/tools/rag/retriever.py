@@ -8,6 +8,8 @@ from langchain_community.vectorstores import FAISS
 from langchain_openai import OpenAIEmbeddings
 
 from backend.src.schemas.results import ToolResult, Citation
+from backend.src.session.disk_gc import touch
+from backend.src.tools.rag.indexer import read_manifest
 
 
 def _rag_dir(session_id: str) -> Path:
@@ -21,16 +23,20 @@ def rag_search(session_id: str, query: str, top_k: int = 5, embedding_model: str
     if not idx.exists():
         return ToolResult(task_id="rag", kind="rag", ok=False, error="No session index found").model_dump()
 
+    touch(idx)
     vs = FAISS.load_local(str(idx), OpenAIEmbeddings(model=embedding_model), allow_dangerous_deserialization=True)
     hits = vs.similarity_search(query, k=top_k)
+    # Shard-built indexes carry content hashes; map them to this session's files.
+    sources = read_manifest(session_id).get("sources", {})
 
     rows: List[Dict[str, Any]] = []
     cites: List[Citation] = []
     for d in hits:
-        src = d.metadata.get("source", "unknown")
+        own = sources.get(d.metadata.get("sha256") or "", {})
+        src = own.get("path") or d.metadata.get("source") or "unknown"
         page = d.metadata.get("page")
         rows.append({"text": d.page_content, "source": src, "page": page})
-        title = f"{Path(src).name}" + (f" (p.{page+1})" if isinstance(page, int) else "")
+        title = f"{own.get('name') or Path(src).name}" + (f" (p.{page+1})" if isinstance(page, int) else "")
         cites.append(Citation(title=title, url=src, snippet=d.page_content[:300]))
 
     return ToolResult(task_id="rag", kind="rag", ok=True, data={"query": query, "matches": rows}, citations=cites).model_dump()
@@ -0,0 +1,106 @@
+# tools/vision/preprocess.py
+from __future__ import annotations
+import base64
+import io
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from backend.src.core.jsonx import read_json_file, write_json_file
+from backend.src.tools.media.blobs import derived_dir, file_sha256
+
+
+# Formats the vision providers accept directly.
+SUPPORTED_MIMES = {"image/png", "image/jpeg", "image/gif", "image/webp"}
+
+_MEMO: Dict[str, Tuple[str, str]] = {}
+_MEMO_MAX = 64
+
+
+def sniff_mime(head: bytes) -> str:
+    """Image MIME type from magic bytes (extensions and upload headers are unreliable)."""
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"heic", b"heix", b"mif1", b"msf1", b"hevc"):
+        return "image/heic"
+    if head[:2] == b"BM":
+        return "image/bmp"
+    if head[:4] in (b"II*\x00", b"MM\x00*"):
+        return "image/tiff"
+    return "application/octet-stream"
+
+
+def _limits() -> Tuple[int, int, int]:
+    # High-detail vision inputs are scaled to fit 2048x2048, then to 768px on the short
+    # side by the provider; anything larger is uploaded only to be thrown away.
+    return (
+        int(os.getenv("VISION_MAX_SIDE", "2048")),
+        int(os.getenv("VISION_MIN_SIDE", "768")),
+        int(os.getenv("VISION_JPEG_QUALITY", "85")),
+    )
+
+
+def _reencode(raw: bytes, mime: str, max_side: int, min_side: int, quality: int) -> Tuple[bytes, str]:
+    img = Image.open(io.BytesIO(raw))
+    if mime == "image/gif" and getattr(img, "is_animated", False):
+        return raw, mime
+    img = ImageOps.exif_transpose(img)  # phone photos: bake in the EXIF rotation
+    w, h = img.size
+    scale = min(1.0, max_side / max(w, h), min_side / max(1, min(w, h)))
+    if scale < 1.0:
+        img = img.resize((max(1, round(w * scale)), max(1, round(h * scale))), Image.LANCZOS)
+    buf = io.BytesIO()
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    if has_alpha:
+        img.save(buf, format="PNG", optimize=True)
+        out_mime = "image/png"
+    else:
+        img.convert("RGB").save(buf, format="JPEG", quality=quality, optimize=True, progressive=True)
+        out_mime = "image/jpeg"
+    out = buf.getvalue()
+    # Keep the original when it is already small and directly usable.
+    if scale == 1.0 and mime in SUPPORTED_MIMES and len(raw) <= len(out):
+        return raw, mime
+    return out, out_mime
+
+
+def prepare_image(path: str, sha: Optional[str] = None) -> Tuple[str, str]:
+    """(mime, base64 payload) ready for a data: URL, cached per image content.
+
+    Detects the real format, downsizes to the provider's useful resolution and
+    re-encodes. Results are memoized in process and stored
+    under the image's derived-artifact directory.
+    """
+    sha = sha or file_sha256(path)
+    max_side, min_side, quality = _limits()
+    variant = f"{sha}:{max_side}:{min_side}:{quality}"
+    hit = _MEMO.get(variant)
+    if hit is not None:
+        return hit
+    cache = derived_dir(sha) / f"vision-{max_side}-{min_side}-{quality}.json"
+    row = read_json_file(cache)
+    if isinstance(row, dict) and row.get("b64"):
+        out = (str(row["mime"]), str(row["b64"]))
+    else:
+        raw = Path(path).read_bytes()
+        mime = sniff_mime(raw[:16])
+        try:
+            raw, mime = _reencode(raw, mime, max_side, min_side, quality)
+        except Exception:
+            pass  # undecodable: send the original if the provider accepts its format
+        if mime not in SUPPORTED_MIMES:
+            raise RuntimeError(f"Unsupported image format for vision: {mime} (could not be converted)")
+        out = (mime, base64.b64encode(raw).decode("ascii"))
+        write_json_file(cache, {"mime": out[0], "b64": out[1]})
+    if len(_MEMO) >= _MEMO_MAX:
+        _MEMO.pop(next(iter(_MEMO)))
+    _MEMO[variant] = out
+    return out
@@ -1,21 +1,103 @@
 # tools/vision/vision_tool.py
 from __future__ import annotations
-import base64
+import json
 import os
-from typing import Any, Dict
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Union
 
 from langchain_openai import ChatOpenAI
 
+from backend.src.core.http import http_client
 from backend.src.schemas.results import ToolResult
+from backend.src.tools.media.artifact_cache import cache_get_bytes, cache_key, cache_put_bytes
+from backend.src.tools.media.blobs import file_sha256
+from backend.src.tools.vision.preprocess import prepare_image
 
 
-def vision_analyze(prompt: str, image_path: str) -> Dict[str, Any]:
+MAX_NOTES_PER_IMAGE = 8
+NOTE_MAX_CHARS = 1500
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case, whitespace and punctuation folded; words and their order are kept, so
+    only trivially different spellings of the same question share a cache entry."""
+    return " ".join(re.findall(r"[a-z0-9]+", (prompt or "").lower())) or "describe"
+
+
+def remember_note(memory: Dict[str, Any], shas: List[str], prompt: str, text: str, model: str) -> None:
+    """Record a vision finding per image in the session's artifact memory."""
+    notes = memory.setdefault("vision_notes", {})
+    for sha in shas:
+        rows = [n for n in notes.get(sha) or [] if n.get("prompt") != prompt]
+        rows.append({"prompt": prompt, "text": text[:NOTE_MAX_CHARS], "model": model, "images": len(shas)})
+        notes[sha] = rows[-MAX_NOTES_PER_IMAGE:]
+
+
+def image_notes(attachments: List[Dict[str, Any]], memory: Dict[str, Any], max_chars: int = 3000) -> str:
+    """This session's earlier vision findings for its image attachments, as plain text context."""
+    notes = (memory or {}).get("vision_notes") or {}
+    if not notes:
+        return ""
+    rows: List[str] = []
+    for a in attachments:
+        if str(a.get("kind", "")).lower() != "image" or not a.get("path"):
+            continue
+        try:
+            sha = a.get("sha256") or file_sha256(a["path"])
+        except OSError:
+            continue
+        for n in notes.get(sha) or []:
+            rows.append(f"[{a.get('name') or a.get('id')}] ({n.get('prompt')}): {n.get('text', '')}")
+    return "\n".join(rows)[:max_chars]
+
+
+def vision_analyze(
+    prompt: str,
+    image_paths: Union[str, List[str]],
+    shas: Optional[List[Optional[str]]] = None,
+    fresh: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """Ask the vision model about one or more images in a single request.
+
+    Results are cached by (image hashes, normalized prompt, model); `data` carries the
+    hashes and normalized prompt so the caller can record a note in its session. With
+    `on_token`, the answer is streamed and each text chunk is passed on as it arrives.
+    """
+    model = os.getenv("VISION_MODEL", "gpt-4o-mini")
+    paths = [image_paths] if isinstance(image_paths, str) else list(image_paths)
+    shas = [s or file_sha256(p) for p, s in zip(paths, shas or [None] * len(paths))]
+    norm = normalize_prompt(prompt)
+    key = cache_key("vision", model=model, images=shas, prompt=norm)
+    hit = None if fresh else cache_get_bytes(key)
+    if hit is not None:
+        out = json.loads(hit.decode("utf-8"))["text"]
+        return ToolResult(
+            task_id="vision", kind="vision", ok=True,
+            data={"text": out, "model": model, "images": len(paths), "shas": shas, "prompt": norm, "cached": True},
+        ).model_dump()
+
     if not os.getenv("OPENAI_API_KEY"):
         raise RuntimeError("Missing env var: OPENAI_API_KEY")
-    model = os.getenv("VISION_MODEL", "gpt-4o-mini")
-    b64 = base64.b64encode(open(image_path, "rb").read()).decode("utf-8")
-    msg = [{"type": "text", "text": prompt},
-           {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{b64}"}}]
-    llm = ChatOpenAI(model=model, temperature=0.2)
-    out = llm.invoke([{"role": "user", "content": msg}]).content
-    return ToolResult(task_id="vision", kind="vision", ok=True, data={"text": out, "model": model}).model_dump()
+    with ThreadPoolExecutor(max_workers=min(4, max(1, len(paths)))) as pool:
+        payloads = list(pool.map(prepare_image, paths, shas))
+    msg = [{"type": "text", "text": prompt}]
+    msg += [{"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64}"}} for mime, b64 in payloads]
+    llm = ChatOpenAI(model=model, temperature=0.2, http_client=http_client("api.openai.com"))
+    if on_token is None:
+        out = llm.invoke([{"role": "user", "content": msg}]).content
+    else:
+        parts: List[str] = []
+        for chunk in llm.stream([{"role": "user", "content": msg}]):
+            tok = chunk.content if isinstance(chunk.content, str) else ""
+            if tok:
+                parts.append(tok)
+                on_token(tok)
+        out = "".join(parts)
+    if isinstance(out, str) and out.strip():
+        cache_put_bytes(key, json.dumps({"text": out}, ensure_ascii=False).encode("utf-8"), "json")
+    return ToolResult(
+        task_id="vision", kind="vision", ok=True,
+        data={"text": out, "model": model, "images": len(paths), "shas": shas, "prompt": norm},
+    ).model_dump()
@@ -0,0 +1,114 @@
+# tools/web/arxiv_store.py
+from __future__ import annotations
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+# Metadata of every paper fetched from the arXiv API, with a full-text index over
+# titles and abstracts. Papers never change, so title lookups need no expiry; topic
+# searches are answered locally only while the topic was fetched recently.
+STORE_DB = "backend/data/arxiv.sqlite"
+
+_DB: Dict[str, Any] = {"conn": None}
+_mu = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.getenv("ARXIV_STORE", "1") != "0"
+
+
+def _conn() -> sqlite3.Connection:
+    if _DB["conn"] is None:
+        path = os.getenv("ARXIV_DB_PATH", STORE_DB)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS papers (url TEXT PRIMARY KEY, title TEXT NOT NULL, summary TEXT NOT NULL, "
+            "authors TEXT NOT NULL, published TEXT NOT NULL, pdf_url TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(url UNINDEXED, title, summary)")
+        db.execute("CREATE TABLE IF NOT EXISTS topics (key TEXT PRIMARY KEY, fetched_at REAL NOT NULL)")
+        _DB["conn"] = db
+    return _DB["conn"]
+
+
+def topic_key(terms: List[str], year: Optional[int]) -> str:
+    return " ".join(sorted(set(terms))) + (f" @{year}" if year else "")
+
+
+def _fts_words(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+
+def save(rows: List[Dict[str, Any]], key: str = "") -> None:
+    """Upsert fetched papers; `key` marks the topic as freshly fetched."""
+    if not enabled():
+        return
+    now = time.time()
+    with _mu:
+        db = _conn()
+        db.execute("BEGIN")
+        try:
+            for r in rows:
+                url = str(r.get("url") or "")
+                if not url or not r.get("title"):
+                    continue
+                db.execute(
+                    "INSERT INTO papers (url, title, summary, authors, published, pdf_url, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET title = excluded.title, summary = excluded.summary, authors = excluded.authors, "
+                    "published = excluded.published, pdf_url = excluded.pdf_url, fetched_at = excluded.fetched_at",
+                    (url, r["title"], r.get("summary") or "", json.dumps(r.get("authors") or []), str(r.get("published") or ""),
+                     r.get("pdf_url") or "", now),
+                )
+                db.execute("DELETE FROM papers_fts WHERE url = ?", (url,))
+                db.execute("INSERT INTO papers_fts (url, title, summary) VALUES (?, ?, ?)", (url, r["title"], r.get("summary") or ""))
+            if key:
+                db.execute(
+                    "INSERT INTO topics (key, fetched_at) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET fetched_at = excluded.fetched_at",
+                    (key, now),
+                )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+
+def topic_fresh(key: str) -> bool:
+    if not enabled():
+        return False
+    max_age = float(os.getenv("ARXIV_TOPIC_FRESH_SECS", str(6 * 3600)))
+    with _mu:
+        row = _conn().execute("SELECT fetched_at FROM topics WHERE key = ?", (key,)).fetchone()
+    return row is not None and time.time() - row[0] < max_age
+
+
+def search(title_hint: str = "", terms: Optional[List[str]] = None, limit: int = 30) -> List[Dict[str, Any]]:
+    """Stored papers matching a title phrase, or any of `terms` (best bm25 first)."""
+    if not enabled():
+        return []
+    if title_hint:
+        words = _fts_words(title_hint)
+        match = 'title : "' + " ".join(words) + '"' if words else ""
+    else:
+        words = sorted({w for t in terms or [] for w in _fts_words(t)})
+        match = " OR ".join(f'"{w}"' for w in words)
+    if not match:
+        return []
+    with _mu:
+        rows = _conn().execute(
+            "SELECT p.url, p.title, p.summary, p.authors, p.published, p.pdf_url FROM papers_fts f "
+            "JOIN papers p ON p.url = f.url WHERE papers_fts MATCH ? ORDER BY f.rank LIMIT ?",
+            (match, int(limit)),
+        ).fetchall()
+    return [
+        {"title": r[1], "url": r[0], "pdf_url": r[5], "summary": r[2], "authors": json.loads(r[3]), "published": r[4]}
+        for r in rows
+    ]
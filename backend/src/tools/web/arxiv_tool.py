@@ -1,14 +1,20 @@
 # tools/web/arxiv_tool.py
 from __future__ import annotations
 import re
+import xml.etree.ElementTree as ET
+from datetime import datetime
 from typing import Any, Dict, List
+from urllib.parse import urlencode
 
 from langchain.tools import tool
 from langchain_community.tools import ArxivQueryRun
 from langchain_community.utilities import ArxivAPIWrapper
 import arxiv as arxiv_py
 
+from backend.src.core.http import requests_session
 from backend.src.schemas.results import ToolResult, Citation
+from backend.src.tools.web import arxiv_store
+from backend.src.tools.web.web_cache import cached_search
 
 
 GENAI_HINT_TERMS = {
@@ -227,35 +233,96 @@ def arxiv_search(query: str, top_k: int = 5) -> Dict[str, Any]:
     topic = _clean_topic_query(topic)
     title_hint = _extract_title_hint(topic)
     api_query = _build_effective_query(topic, year, title_hint=title_hint)
+    # Ranking depends on the topic terms as well as the API query.
+    return cached_search("arxiv", f"{api_query} | {topic}", top_k, lambda: _search(q, topic, year, title_hint, api_query, top_k))
 
-    try:
-        search = arxiv_py.Search(
-            query=api_query,
-            max_results=max(15, int(top_k) * 6),
-            sort_by=(arxiv_py.SortCriterion.Relevance if title_hint else arxiv_py.SortCriterion.SubmittedDate),
+
+def _local_rows(topic: str, year: int | None, title_hint: str, top_k: int) -> List[Dict[str, Any]]:
+    """Answer from the local paper store when it can: a stored paper matching the title
+    hint, or a topic fetched from the API recently enough to have enough matches."""
+    limit = max(15, int(top_k) * 6)
+    if title_hint:
+        rows = arxiv_store.search(title_hint=title_hint, limit=limit)
+        best = max((_score_row(r, [], False, title_hint=title_hint) for r in rows), default=0)
+        # Same bar as an exact or contained title match from the API.
+        return _rank_and_filter(rows, topic, top_k, title_hint=title_hint) if best >= 450 else []
+    terms = _topic_terms(topic)
+    if not terms or not arxiv_store.topic_fresh(arxiv_store.topic_key(terms, year)):
+        return []
+    rows = arxiv_store.search(terms=terms, limit=limit * 4)
+    if year:
+        rows = [x for x in rows if str(x.get("published", "")).startswith(str(year))]
+    rows.sort(key=lambda x: str(x.get("published", "")), reverse=True)  # API order is newest first
+    ranked = [r for r in _rank_and_filter(rows, topic, top_k) if _score_row(r, terms, _is_genai_intent(topic)) > 1]
+    return ranked if len(ranked) >= max(1, int(top_k)) else []
+
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+def _fetch_papers(api_query: str, max_results: int, by_relevance: bool) -> List[Dict[str, Any]]:
+    """One page of the arXiv query API, fetched over the shared keep-alive session.
+
+    arxiv.Client opens a session per client and has no public way to pass one in,
+    so the request is made here and the Atom feed parsed directly.
+    """
+    sort_by = arxiv_py.SortCriterion.Relevance if by_relevance else arxiv_py.SortCriterion.SubmittedDate
+    url = arxiv_py.Client.query_url_format.format(urlencode({
+        "search_query": api_query,
+        "sortBy": sort_by.value,
+        "sortOrder": arxiv_py.SortOrder.Descending.value,
+        "start": "0",
+        "max_results": str(max_results),
+    }))
+    resp = requests_session().get(url, headers={"user-agent": "omniagent"}, timeout=30)
+    resp.raise_for_status()
+    rows: List[Dict[str, Any]] = []
+    for e in ET.fromstring(resp.content).iter(f"{_ATOM}entry"):
+        if "/api/errors" in (e.findtext(f"{_ATOM}id") or ""):
+            continue  # the API reports a bad query as a single error entry
+        published = (e.findtext(f"{_ATOM}published") or "").strip()
+        try:
+            published = str(datetime.fromisoformat(published.replace("Z", "+00:00")))  # same form as arxiv.Result
+        except ValueError:
+            pass
+        pdf = next((ln.get("href") for ln in e.iter(f"{_ATOM}link") if ln.get("title") == "pdf"), "")
+        rows.append(
+            {
+                "title": re.sub(r"\s+", " ", e.findtext(f"{_ATOM}title") or "").strip(),
+                "url": (e.findtext(f"{_ATOM}id") or "").strip(),
+                "pdf_url": pdf or "",
+                "summary": (e.findtext(f"{_ATOM}summary") or "").strip().replace("\n", " "),
+                "authors": [(a.findtext(f"{_ATOM}name") or "").strip() for a in e.iter(f"{_ATOM}author")],
+                "published": published,
+            }
         )
-        client = arxiv_py.Client(page_size=max(15, int(top_k) * 6), delay_seconds=0.0, num_retries=2)
-        rows: List[Dict[str, Any]] = []
-        cites: List[Citation] = []
-        for r in client.results(search):
-            abs_url = getattr(r, "entry_id", "") or ""
-            pdf_url = getattr(r, "pdf_url", "") or ""
-            summary = (getattr(r, "summary", "") or "").strip().replace("\n", " ")
-            title = (getattr(r, "title", "") or "").strip()
-            published = str(getattr(r, "published", "") or "")
-            authors = [a.name for a in getattr(r, "authors", [])] if getattr(r, "authors", None) else []
-            rows.append(
-                {
-                    "title": title,
-                    "url": abs_url,
-                    "pdf_url": pdf_url,
-                    "summary": summary,
-                    "authors": authors,
-                    "published": published,
-                }
-            )
-            if title and abs_url:
-                cites.append(Citation(title=title, url=abs_url, snippet=summary[:300]))
+    return rows
+
+
+def _search(q: str, topic: str, year: int | None, title_hint: str, api_query: str, top_k: int) -> Dict[str, Any]:
+    try:
+        local = _local_rows(topic, year, title_hint, top_k)
+    except Exception:
+        local = []
+    if local:
+        cites = [Citation(title=r["title"], url=r["url"], snippet=str(r.get("summary", ""))[:300]) for r in local]
+        return ToolResult(
+            task_id="arxiv",
+            kind="web",
+            ok=True,
+            data={"query": q, "effective_query": api_query, "items": local, "local": True},
+            citations=cites,
+        ).model_dump()
+
+    try:
+        rows = _fetch_papers(api_query, max(15, int(top_k) * 6), by_relevance=bool(title_hint))
+        cites: List[Citation] = [
+            Citation(title=r["title"], url=r["url"], snippet=r["summary"][:300]) for r in rows if r["title"] and r["url"]
+        ]
+        try:
+            arxiv_store.save(rows, "" if title_hint else arxiv_store.topic_key(_topic_terms(topic), year))
+        except Exception:
+            pass  # the store is an accelerator; never fail a search on it
         if year:
             rows = [x for x in rows if str(x.get("published", "")).startswith(str(year))]
             cites = [c for c in cites if any(c.url == x.get("url") for x in rows)]
@@ -5,14 +5,18 @@ import re
 from typing import Any, Dict, List
 
 from langchain.tools import tool
-from langchain_tavily import TavilySearch
 
+from backend.src.core.http import http_client
 from backend.src.schemas.results import ToolResult, Citation
+from backend.src.tools.web.web_cache import cached_search
+
+
+TAVILY_API_URL = "https://api.tavily.com"
 
 
 @tool("tavily_search")
 def tavily_search(query: str, top_k: int = 5) -> Dict[str, Any]:
-    """Web search via Tavily (langchain-tavily). Returns results + citations."""
+    """Web search via the Tavily API. Returns results + citations."""
     if not os.getenv("TAVILY_API_KEY"):
         raise RuntimeError("Missing env var: TAVILY_API_KEY")
 
@@ -26,19 +30,30 @@ def tavily_search(query: str, top_k: int = 5) -> Dict[str, Any]:
     if is_news_query and not re.search(r"\b(today|this week|past \d+ days?)\b", q_l):
         effective_query = f"{q} today latest updates"
 
-    t = TavilySearch(max_results=top_k, topic=topic)
-    out: Dict[str, Any] = t.invoke({"query": effective_query})
-
-    rows: List[Dict[str, Any]] = out.get("results", [])
-    if is_news_query:
-        # Drop low-signal aggregator/search pages for cleaner news summaries.
-        blocked = ("google.com/search", "news.google.com", "/tag/", "/topic/", "/topics/")
-        rows = [r for r in rows if not any(b in str(r.get("url", "")).lower() for b in blocked)]
-    cites = [
-        Citation(title=r.get("title", ""), url=r.get("url", ""), snippet=r.get("content"))
-        for r in rows
-    ]
-    return ToolResult(
-        task_id="tavily", kind="web", ok=True,
-        data={"query": q, "effective_query": effective_query, **{**out, "results": rows}}, citations=cites
-    ).model_dump()
+    def fetch() -> Dict[str, Any]:
+        # Same request body TavilySearch sends, over the shared keep-alive client.
+        r = http_client("api.tavily.com").post(
+            f"{os.getenv('TAVILY_API_URL', TAVILY_API_URL)}/search",
+            json={"query": effective_query, "max_results": top_k, "topic": topic},
+            headers={"Authorization": f"Bearer {os.getenv('TAVILY_API_KEY')}", "X-Client-Source": "omniagent"},
+        )
+        if r.status_code != 200:
+            detail = r.json().get("detail", {}) if r.headers.get("content-type", "").startswith("application/json") else {}
+            raise ValueError(f"Error {r.status_code}: {detail.get('error') if isinstance(detail, dict) else 'Unknown error'}")
+        out: Dict[str, Any] = r.json()
+
+        rows: List[Dict[str, Any]] = out.get("results", [])
+        if is_news_query:
+            # Drop low-signal aggregator/search pages for cleaner news summaries.
+            blocked = ("google.com/search", "news.google.com", "/tag/", "/topic/", "/topics/")
+            rows = [r for r in rows if not any(b in str(r.get("url", "")).lower() for b in blocked)]
+        cites = [
+            Citation(title=r.get("title", ""), url=r.get("url", ""), snippet=r.get("content"))
+            for r in rows
+        ]
+        return ToolResult(
+            task_id="tavily", kind="web", ok=True,
+            data={"query": q, "effective_query": effective_query, **{**out, "results": rows}}, citations=cites
+        ).model_dump()
+
+    return cached_search(f"tavily:{topic}", effective_query, top_k, fetch, ttl_source="tavily_news" if is_news_query else "tavily")
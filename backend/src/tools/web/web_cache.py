@@ -0,0 +1,116 @@
+# tools/web/web_cache.py
+from __future__ import annotations
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+# Search results shared by every session and every process using the same file.
+CACHE_DB = "backend/data/web-cache.sqlite"
+
+# Seconds a result stays fresh, per source. News moves fast; encyclopedia and paper
+# listings barely change within a day.
+DEFAULT_TTLS = {
+    "tavily_news": 15 * 60,
+    "tavily": 6 * 3600,
+    "wikipedia": 7 * 86400,
+    "arxiv": 86400,
+}
+
+_DB: Dict[str, Any] = {"conn": None}
+_mu = threading.Lock()
+# One fetch per key at a time, so a burst of identical queries hits the network once.
+_inflight: Dict[str, threading.Lock] = {}
+_STATS: Dict[str, Dict[str, int]] = {}
+
+
+def enabled() -> bool:
+    return os.getenv("WEB_CACHE", "1") != "0"
+
+
+def ttl_for(source: str) -> float:
+    return float(os.getenv(f"WEB_CACHE_TTL_{source.upper()}_SECS", str(DEFAULT_TTLS.get(source, 3600))))
+
+
+def normalize_query(q: str) -> str:
+    return re.sub(r"\s+", " ", (q or "").strip().lower()).rstrip(" ?.!")
+
+
+def _conn() -> sqlite3.Connection:
+    if _DB["conn"] is None:
+        path = os.getenv("WEB_CACHE_DB_PATH", CACHE_DB)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)")
+        db.execute("CREATE INDEX IF NOT EXISTS results_expires_at ON results (expires_at)")
+        _DB["conn"] = db
+    return _DB["conn"]
+
+
+def _get(key: str) -> Optional[Dict[str, Any]]:
+    with _mu:
+        row = _conn().execute("SELECT data FROM results WHERE key = ? AND expires_at > ?", (key, time.time())).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def _put(key: str, data: Dict[str, Any], ttl: float) -> None:
+    now = time.time()
+    with _mu:
+        db = _conn()
+        db.execute(
+            "INSERT INTO results (key, data, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at",
+            (key, json.dumps(data, ensure_ascii=False), now + ttl),
+        )
+        db.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+
+
+def _count(source: str, hit: bool) -> None:
+    s = _STATS.setdefault(source, {"hits": 0, "misses": 0})
+    s["hits" if hit else "misses"] += 1
+
+
+def cached_search(source: str, effective_query: str, top_k: int, fetch: Callable[[], Dict[str, Any]], ttl_source: str = "") -> Dict[str, Any]:
+    """Read-through cache for one search call, keyed by (source, normalized query, top_k).
+
+    Only successful results are stored. Hits are returned with data["cached"] = True.
+    `ttl_source` picks a different TTL class than `source` (e.g. tavily news).
+    """
+    if not enabled():
+        return fetch()
+    key = json.dumps([source, normalize_query(effective_query), int(top_k)])
+    hit = _get(key)
+    if hit is None:
+        with _mu:
+            lock = _inflight.setdefault(key, threading.Lock())
+        with lock:
+            hit = _get(key)  # filled while waiting for another thread's fetch
+            if hit is None:
+                try:
+                    out = fetch()
+                    _count(source, False)
+                    # Stored before the key is released, so a waiter's re-check finds it.
+                    if out.get("ok"):
+                        _put(key, out, ttl_for(ttl_source or source))
+                finally:
+                    with _mu:
+                        _inflight.pop(key, None)
+                return out
+    _count(source, True)
+    hit.setdefault("data", {})["cached"] = True
+    return hit
+
+
+def web_cache_stats() -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for source, s in _STATS.items():
+        total = s["hits"] + s["misses"]
+        out[source] = {**s, "hit_rate": round(s["hits"] / total, 3) if total else 0.0}
+    return out
@@ -3,17 +3,21 @@ from __future__ import annotations
 import os
 from typing import Any, Dict, List
 
-import requests
-
+from backend.src.core.http import http_client
 from backend.src.schemas.results import ToolResult
+from backend.src.tools.web.web_cache import cached_search
 
 
 def wikipedia_search(query: str, top_k: int = 3) -> Dict[str, Any]:
+    return cached_search("wikipedia", query, top_k, lambda: _search(query, top_k))
+
+
+def _search(query: str, top_k: int) -> Dict[str, Any]:
     try:
         url = "https://en.wikipedia.org/w/api.php"
         params = {"action": "query", "list": "search", "srsearch": query, "format": "json", "srlimit": top_k}
         headers = {"User-Agent": os.getenv("WIKI_UA", "OmniAgent/0.1 (contact: you@example.com)")}
-        r = requests.get(url, params=params, headers=headers, timeout=12)
+        r = http_client("en.wikipedia.org").get(url, params=params, headers=headers, timeout=12)
         r.raise_for_status()
         data = r.json()
         hits = (data.get("query", {}).get("search") or [])[:top_k]
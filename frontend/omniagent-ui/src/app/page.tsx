@@ -156,7 +156,7 @@ export default function Page() {
                 }),
             );
         }
-        if (msg.type === "block_end") {
+        if (msg.type === "block_end" || msg.type === "block_update") {
             flushTokenBuffer();
             const id = msg.data?.block_id;
             if (!id) return;
@@ -4,6 +4,7 @@ export type SSEMessage = {
     run_id?: string;
     trace_id?: string;
     ts_ms?: number;
+    id?: number;
 };
 
 export async function* ssePost(